@@ -0,0 +1,30 @@
+"""added difficulty index to questions
+
+Revision ID: 147d6ba03014
+Revises: d3a006f392c1
+Create Date: 2026-10-18 10:02:51.804417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '147d6ba03014'
+down_revision: Union[str, None] = 'd3a006f392c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Serves the difficulty branch of the admin search; without an index on it
+    # the OR of the search predicates could not be a bitmap scan
+    with op.get_context().autocommit_block():
+        op.create_index('ix_questions_difficulty_lower', 'questions', [sa.text('lower(difficulty)')],
+                        unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_questions_difficulty_lower', table_name='questions')
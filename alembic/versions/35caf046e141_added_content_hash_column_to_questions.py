@@ -0,0 +1,44 @@
+"""added content_hash column to questions
+
+Revision ID: 35caf046e141
+Revises: 4641b1b3bb17
+Create Date: 2026-10-18 05:33:02.115010
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '35caf046e141'
+down_revision: Union[str, None] = '4641b1b3bb17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('questions', sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+    # Same digest as app.ingest.question_content_hash(): sha256 of the lower-cased
+    # category, question text and correct answer joined by newlines
+    op.execute("""
+        UPDATE questions
+        SET content_hash = encode(sha256(convert_to(
+            lower(category || E'\\n' || question_text || E'\\n' || correct_option), 'UTF8')), 'hex')
+    """)
+    # Keep the hash on the oldest copy of a duplicated question only
+    op.execute("""
+        UPDATE questions AS q
+        SET content_hash = NULL
+        FROM questions AS keep
+        WHERE q.content_hash = keep.content_hash AND q.id > keep.id
+    """)
+
+    op.create_index(op.f('ix_questions_content_hash'), 'questions', ['content_hash'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_questions_content_hash'), table_name='questions')
+    op.drop_column('questions', 'content_hash')
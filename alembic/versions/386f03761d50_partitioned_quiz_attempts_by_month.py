@@ -0,0 +1,134 @@
+"""partitioned quiz_attempts by month
+
+Revision ID: 386f03761d50
+Revises: a749c5345b35
+Create Date: 2026-10-18 05:54:37.655729
+
+"""
+from datetime import date, datetime, timezone
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '386f03761d50'
+down_revision: Union[str, None] = 'a749c5345b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows per copy statement
+BATCH_SIZE = 10000
+# Months created past the current one; app/partitions.py keeps this going
+MONTHS_AHEAD = 3
+
+COLUMNS = "id, user_id, question_id, user_answer, correct_answer, is_correct, session_id"
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def create_partition(bind, parent: str, month: date):
+    bind.execute(sa.text(
+        f"CREATE TABLE quiz_attempts_p{month.year:04d}_{month.month:02d} PARTITION OF {parent} "
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    ))
+
+
+def add_constraints(table: str, primary_key: list):
+    op.create_primary_key('quiz_attempts_pkey', table, primary_key)
+    op.create_index('ix_quiz_attempts_id', table, ['id'], unique=False)
+    op.create_index('ix_quiz_attempts_user_id_session_id', table, ['user_id', 'session_id'], unique=False)
+    op.create_foreign_key('quiz_attempts_user_id_fkey', table, 'users', ['user_id'], ['id'])
+    op.create_foreign_key('quiz_attempts_question_id_fkey', table, 'questions', ['question_id'], ['id'])
+    op.create_foreign_key('quiz_attempts_session_id_fkey', table, 'quiz_sessions', ['session_id'], ['id'])
+
+
+def move_sequence(bind, table: str):
+    # The new table takes over the ID sequence, so IDs keep counting up and the
+    # sequence survives dropping the old table
+    bind.execute(sa.text(f"ALTER TABLE {table} ALTER COLUMN id SET DEFAULT nextval('quiz_attempts_id_seq')"))
+    bind.execute(sa.text(f"ALTER SEQUENCE quiz_attempts_id_seq OWNED BY {table}.id"))
+
+
+def upgrade() -> None:
+    # Rebuilds quiz_attempts as a table range-partitioned by month on the new
+    # attempted_at column. Run it with the app stopped: attempts written while
+    # the rows are being copied would not be carried over.
+    bind = op.get_bind()
+    bind.execute(sa.text(f"""
+        CREATE TABLE quiz_attempts_partitioned (
+            id integer NOT NULL,
+            user_id integer NOT NULL,
+            question_id integer NOT NULL,
+            user_answer varchar,
+            correct_answer varchar NOT NULL,
+            is_correct boolean,
+            session_id integer NOT NULL,
+            attempted_at timestamp with time zone NOT NULL DEFAULT now()
+        ) PARTITION BY RANGE (attempted_at)
+    """))
+
+    # Existing attempts take the time their session was submitted. A partition
+    # is created for every month that has attempts, plus the upcoming ones.
+    months = {
+        row[0].date() for row in bind.execute(sa.text("""
+            SELECT DISTINCT date_trunc('month', COALESCE(s.submitted_at, s.started_at) AT TIME ZONE 'UTC')
+            FROM quiz_attempts AS a
+            JOIN quiz_sessions AS s ON s.id = a.session_id
+        """))
+    }
+    current = datetime.now(timezone.utc).date().replace(day=1)
+    months.update(add_months(current, n) for n in range(MONTHS_AHEAD + 1))
+    for month in sorted(months):
+        create_partition(bind, 'quiz_attempts_partitioned', month)
+
+    # Copied before the indexes exist, which is much faster than maintaining them row by row
+    last_attempt_id = bind.execute(sa.text("SELECT COALESCE(MAX(id), 0) FROM quiz_attempts")).scalar()
+    for low in range(0, last_attempt_id + 1, BATCH_SIZE):
+        bind.execute(sa.text(f"""
+            INSERT INTO quiz_attempts_partitioned ({COLUMNS}, attempted_at)
+            SELECT {", ".join(f"a.{column}" for column in COLUMNS.split(", "))},
+                   COALESCE(s.submitted_at, s.started_at)
+            FROM quiz_attempts AS a
+            JOIN quiz_sessions AS s ON s.id = a.session_id
+            WHERE a.id >= :low AND a.id < :high
+        """), {"low": low, "high": low + BATCH_SIZE})
+
+    move_sequence(bind, 'quiz_attempts_partitioned')
+    op.drop_table('quiz_attempts')
+    op.rename_table('quiz_attempts_partitioned', 'quiz_attempts')
+    add_constraints('quiz_attempts', ['id', 'attempted_at'])
+
+
+def downgrade() -> None:
+    # Folds the attached partitions back into a plain table; months already
+    # archived by app/partitions.py stay in their archive files
+    bind = op.get_bind()
+    bind.execute(sa.text("""
+        CREATE TABLE quiz_attempts_unpartitioned (
+            id integer NOT NULL,
+            user_id integer NOT NULL,
+            question_id integer NOT NULL,
+            user_answer varchar,
+            correct_answer varchar NOT NULL,
+            is_correct boolean,
+            session_id integer NOT NULL
+        )
+    """))
+    last_attempt_id = bind.execute(sa.text("SELECT COALESCE(MAX(id), 0) FROM quiz_attempts")).scalar()
+    for low in range(0, last_attempt_id + 1, BATCH_SIZE):
+        bind.execute(sa.text(f"""
+            INSERT INTO quiz_attempts_unpartitioned ({COLUMNS})
+            SELECT {COLUMNS} FROM quiz_attempts
+            WHERE id >= :low AND id < :high
+        """), {"low": low, "high": low + BATCH_SIZE})
+
+    move_sequence(bind, 'quiz_attempts_unpartitioned')
+    op.drop_table('quiz_attempts')  # and its partitions
+    op.rename_table('quiz_attempts_unpartitioned', 'quiz_attempts')
+    add_constraints('quiz_attempts', ['id'])
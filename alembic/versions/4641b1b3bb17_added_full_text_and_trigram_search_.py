@@ -0,0 +1,53 @@
+"""added full text and trigram search indexes to questions
+
+Revision ID: 4641b1b3bb17
+Revises: b70c14b18518
+Create Date: 2026-10-18 05:27:58.446696
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4641b1b3bb17'
+down_revision: Union[str, None] = 'b70c14b18518'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+SEARCH_VECTOR = (
+    "setweight(to_tsvector('english', question_text), 'A') || "
+    "setweight(to_tsvector('english', category || ' ' || difficulty), 'B')"
+)
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column('questions', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(SEARCH_VECTOR, persisted=True),
+        nullable=True,
+    ))
+
+    # Build the GIN indexes without locking the table against writes
+    with op.get_context().autocommit_block():
+        op.create_index('ix_questions_search_vector', 'questions', ['search_vector'],
+                        unique=False, postgresql_using='gin', postgresql_concurrently=True)
+        op.create_index('ix_questions_question_text_trgm', 'questions', ['question_text'],
+                        unique=False, postgresql_using='gin', postgresql_concurrently=True,
+                        postgresql_ops={'question_text': 'gin_trgm_ops'})
+        op.create_index('ix_questions_category_trgm', 'questions', ['category'],
+                        unique=False, postgresql_using='gin', postgresql_concurrently=True,
+                        postgresql_ops={'category': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    op.drop_index('ix_questions_category_trgm', table_name='questions')
+    op.drop_index('ix_questions_question_text_trgm', table_name='questions')
+    op.drop_index('ix_questions_search_vector', table_name='questions')
+    op.drop_column('questions', 'search_vector')
@@ -0,0 +1,96 @@
+"""decode html entities in imported questions
+
+Revision ID: 48f7508059e9
+Revises: 960c5447ccd1
+Create Date: 2026-10-18 09:12:40.318204
+
+"""
+import hashlib
+import html
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '48f7508059e9'
+down_revision: Union[str, None] = '960c5447ccd1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows per read
+BATCH_SIZE = 10000
+
+TEXT_COLUMNS = ('category', 'question_text', 'option_a', 'option_b', 'option_c', 'option_d', 'correct_option')
+
+
+def question_content_hash(category: str, question_text: str, correct_answer: str) -> str:
+    # Frozen copy of app.ingest.question_content_hash() as of this revision
+    content = "\n".join((category, question_text, correct_answer)).lower()
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+questions = sa.table(
+    'questions',
+    sa.column('id', sa.Integer),
+    sa.column('admincreated', sa.Boolean),
+    sa.column('content_hash', sa.String),
+    *(sa.column(name, sa.String) for name in TEXT_COLUMNS),
+)
+
+
+def upgrade() -> None:
+    # Questions imported before the ingestion pipeline were stored as opentdb
+    # sends them, with HTML entities encoded, and 35caf046e141 hashed them that
+    # way; the pipeline decodes them first, so it would store every such
+    # question a second time. Decode them the way app.ingest.normalize_item()
+    # does and rehash them with the same digest. The options are decoded too,
+    # so the correct option still matches one of them.
+    bind = op.get_bind()
+    op.drop_index(op.f('ix_questions_content_hash'), table_name='questions')
+
+    update = (
+        questions.update()
+        .where(questions.c.id == sa.bindparam('row_id'))
+        .values({name: sa.bindparam(name) for name in TEXT_COLUMNS + ('content_hash',)})
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(questions.c.id, *(questions.c[name] for name in TEXT_COLUMNS))
+            .where(questions.c.admincreated.is_(False), questions.c.id > last_id)
+            .order_by(questions.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+
+        changed = []
+        for row in rows:
+            values = {name: getattr(row, name) for name in TEXT_COLUMNS}
+            decoded = {name: html.unescape(value).strip() if value else value for name, value in values.items()}
+            if decoded != values:
+                decoded['row_id'] = row.id
+                decoded['content_hash'] = question_content_hash(
+                    decoded['category'], decoded['question_text'], decoded['correct_option']
+                )
+                changed.append(decoded)
+        if changed:
+            bind.execute(update, changed)
+
+    # Keep the hash on the oldest copy of a question only, as 35caf046e141 does
+    op.execute("""
+        UPDATE questions AS q
+        SET content_hash = NULL
+        FROM questions AS keep
+        WHERE q.content_hash = keep.content_hash AND q.id > keep.id
+    """)
+    op.create_index(op.f('ix_questions_content_hash'), 'questions', ['content_hash'], unique=True)
+
+
+def downgrade() -> None:
+    # The encoded texts are not kept; the decoded ones are valid under the old revision too
+    pass
@@ -0,0 +1,54 @@
+"""added unique constraint on user_quiz_stats user category difficulty
+
+Revision ID: 71f06facbd5d
+Revises: aaf1df1c4df0
+Create Date: 2026-10-18 04:51:13.751935
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '71f06facbd5d'
+down_revision: Union[str, None] = 'aaf1df1c4df0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Fold duplicate (user_id, category, difficulty) rows into the oldest one
+    op.execute("""
+        WITH totals AS (
+            SELECT MIN(id) AS keep_id,
+                   SUM(COALESCE(solved_count, 0)) AS solved_count,
+                   SUM(COALESCE(correct_count, 0)) AS correct_count
+            FROM user_quiz_stats
+            GROUP BY user_id, category, difficulty
+            HAVING COUNT(*) > 1
+        )
+        UPDATE user_quiz_stats AS s
+        SET solved_count = totals.solved_count, correct_count = totals.correct_count
+        FROM totals
+        WHERE s.id = totals.keep_id
+    """)
+    op.execute("""
+        DELETE FROM user_quiz_stats AS s
+        USING user_quiz_stats AS keep
+        WHERE s.user_id = keep.user_id
+          AND s.category = keep.category
+          AND s.difficulty = keep.difficulty
+          AND s.id > keep.id
+    """)
+
+    op.create_unique_constraint(
+        'uq_user_quiz_stats_user_category_difficulty',
+        'user_quiz_stats',
+        ['user_id', 'category', 'difficulty'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_user_quiz_stats_user_category_difficulty', 'user_quiz_stats', type_='unique')
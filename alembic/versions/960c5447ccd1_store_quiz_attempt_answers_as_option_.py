@@ -0,0 +1,119 @@
+"""store quiz attempt answers as option indexes
+
+Revision ID: 960c5447ccd1
+Revises: 386f03761d50
+Create Date: 2026-10-18 06:09:25.068536
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '960c5447ccd1'
+down_revision: Union[str, None] = '386f03761d50'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows per copy statement
+BATCH_SIZE = 10000
+
+OPTIONS = ('q.option_a', 'q.option_b', 'q.option_c', 'q.option_d')
+
+
+def option_index(text_column: str) -> str:
+    """SQL for the index (0-3) of the question option equal to `text_column`, or NULL."""
+    whens = " ".join(f"WHEN {option} THEN {index}" for index, option in enumerate(OPTIONS))
+    return f"CASE {text_column} {whens} END"
+
+
+def option_text(index_column: str) -> str:
+    """SQL for the text of the question option at `index_column`, or NULL."""
+    whens = " ".join(f"WHEN {index} THEN {option}" for index, option in enumerate(OPTIONS))
+    return f"CASE {index_column} {whens} END"
+
+
+def rebuild(bind, answer_columns: str, answer_values: str):
+    """
+    Copies quiz_attempts into a new partitioned table with the same partitions,
+    in batches, with the two answer columns replaced, and swaps it in.
+
+    Args:
+        answer_columns (str): Definitions of the new table's two answer columns.
+        answer_values (str): SQL for their values, over the old row `a` and its question `q`.
+    """
+    bind.execute(sa.text(f"""
+        CREATE TABLE quiz_attempts_rebuilt (
+            id integer NOT NULL,
+            user_id integer NOT NULL,
+            question_id integer NOT NULL,
+            {answer_columns},
+            is_correct boolean,
+            session_id integer NOT NULL,
+            attempted_at timestamp with time zone NOT NULL DEFAULT now()
+        ) PARTITION BY RANGE (attempted_at)
+    """))
+    partitions = bind.execute(sa.text("""
+        SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+        FROM pg_inherits AS i
+        JOIN pg_class AS c ON c.oid = i.inhrelid
+        WHERE i.inhparent = CAST('quiz_attempts' AS regclass)
+    """)).all()
+    for name, bound in partitions:
+        bind.execute(sa.text(f"CREATE TABLE {name}_rebuilt PARTITION OF quiz_attempts_rebuilt {bound}"))
+
+    # Copied before the indexes exist, which is much faster than maintaining them row by row
+    last_attempt_id = bind.execute(sa.text("SELECT COALESCE(MAX(id), 0) FROM quiz_attempts")).scalar()
+    for low in range(0, last_attempt_id + 1, BATCH_SIZE):
+        bind.execute(sa.text(f"""
+            INSERT INTO quiz_attempts_rebuilt
+            SELECT a.id, a.user_id, a.question_id, {answer_values}, a.is_correct, a.session_id, a.attempted_at
+            FROM quiz_attempts AS a
+            JOIN questions AS q ON q.id = a.question_id
+            WHERE a.id >= :low AND a.id < :high
+        """), {"low": low, "high": low + BATCH_SIZE})
+
+    # The new table takes over the ID sequence, so IDs keep counting up
+    bind.execute(sa.text("ALTER TABLE quiz_attempts_rebuilt ALTER COLUMN id SET DEFAULT nextval('quiz_attempts_id_seq')"))
+    bind.execute(sa.text("ALTER SEQUENCE quiz_attempts_id_seq OWNED BY quiz_attempts_rebuilt.id"))
+    op.drop_table('quiz_attempts')  # and its partitions
+    op.rename_table('quiz_attempts_rebuilt', 'quiz_attempts')
+    for name, _ in partitions:
+        op.rename_table(f'{name}_rebuilt', name)
+
+    op.create_primary_key('quiz_attempts_pkey', 'quiz_attempts', ['id', 'attempted_at'])
+    op.create_index('ix_quiz_attempts_id', 'quiz_attempts', ['id'], unique=False)
+    op.create_index('ix_quiz_attempts_user_id_session_id', 'quiz_attempts', ['user_id', 'session_id'], unique=False)
+    op.create_foreign_key('quiz_attempts_user_id_fkey', 'quiz_attempts', 'users', ['user_id'], ['id'])
+    op.create_foreign_key('quiz_attempts_question_id_fkey', 'quiz_attempts', 'questions', ['question_id'], ['id'])
+    op.create_foreign_key('quiz_attempts_session_id_fkey', 'quiz_attempts', 'quiz_sessions', ['session_id'], ['id'])
+    bind.execute(sa.text("ANALYZE quiz_attempts"))
+
+
+def upgrade() -> None:
+    # Replaces the user_answer and correct_answer text copies with the indexes
+    # of the options they name. The table is rebuilt rather than altered in
+    # place, so the space of the text columns is actually given back. Run it
+    # with the app stopped: attempts written while the rows are being copied
+    # would not be carried over.
+    #
+    # An answer that no longer matches any option (its question was edited
+    # since) falls back to the question's current correct option, and to -1
+    # if even that matches none; a user answer becomes NULL.
+    rebuild(
+        op.get_bind(),
+        "user_option smallint, correct_option smallint NOT NULL",
+        f"{option_index('a.user_answer')}, "
+        f"COALESCE({option_index('a.correct_answer')}, {option_index('q.correct_option')}, -1)",
+    )
+
+
+def downgrade() -> None:
+    rebuild(
+        op.get_bind(),
+        "user_answer varchar, correct_answer varchar NOT NULL",
+        f"{option_text('a.user_option')}, COALESCE({option_text('a.correct_option')}, q.correct_option)",
+    )
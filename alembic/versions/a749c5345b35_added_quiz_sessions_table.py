@@ -0,0 +1,97 @@
+"""added quiz_sessions table
+
+Revision ID: a749c5345b35
+Revises: 35caf046e141
+Create Date: 2026-10-18 05:39:01.192773
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a749c5345b35'
+down_revision: Union[str, None] = '35caf046e141'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows per backfill statement
+BATCH_SIZE = 10000
+
+
+def upgrade() -> None:
+    op.create_table('quiz_sessions',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('category', sa.String(), nullable=True),
+    sa.Column('difficulty', sa.String(), nullable=True),
+    sa.Column('started_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('submitted_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('score', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_quiz_sessions_id'), 'quiz_sessions', ['id'], unique=False)
+    op.create_index(op.f('ix_quiz_sessions_user_id'), 'quiz_sessions', ['user_id'], unique=False)
+
+    # The old session IDs were submission timestamps, which can collide across
+    # users, so every (user_id, session_id) pair gets a new ID from the sequence.
+    # Legacy sessions take their category or difficulty only if all their
+    # questions shared it.
+    bind = op.get_bind()
+    bind.execute(sa.text("""
+        CREATE TEMP TABLE quiz_session_backfill AS
+        SELECT nextval('quiz_sessions_id_seq')::integer AS id, s.*
+        FROM (
+            SELECT a.user_id,
+                   a.session_id AS legacy_id,
+                   CASE WHEN COUNT(DISTINCT q.category) = 1 THEN MIN(q.category) END AS category,
+                   CASE WHEN COUNT(DISTINCT q.difficulty) = 1 THEN MIN(q.difficulty) END AS difficulty,
+                   COUNT(*) FILTER (WHERE a.is_correct) AS score
+            FROM quiz_attempts AS a
+            LEFT JOIN questions AS q ON q.id = a.question_id
+            GROUP BY a.user_id, a.session_id
+            ORDER BY a.user_id, a.session_id
+        ) AS s
+    """))
+    bind.execute(sa.text("CREATE INDEX ON quiz_session_backfill (user_id, legacy_id)"))
+
+    last_session_id = bind.execute(sa.text("SELECT COALESCE(MAX(id), 0) FROM quiz_session_backfill")).scalar()
+    for low in range(0, last_session_id + 1, BATCH_SIZE):
+        bind.execute(sa.text("""
+            INSERT INTO quiz_sessions (id, user_id, category, difficulty, started_at, submitted_at, score)
+            SELECT id, user_id, category, difficulty, to_timestamp(legacy_id), to_timestamp(legacy_id), score
+            FROM quiz_session_backfill
+            WHERE id >= :low AND id < :high
+        """), {"low": low, "high": low + BATCH_SIZE})
+
+    # Re-point the attempts through a new column, so an updated row can never be
+    # matched again by a later batch
+    op.add_column('quiz_attempts', sa.Column('quiz_session_id', sa.Integer(), nullable=True))
+    last_attempt_id = bind.execute(sa.text("SELECT COALESCE(MAX(id), 0) FROM quiz_attempts")).scalar()
+    for low in range(0, last_attempt_id + 1, BATCH_SIZE):
+        bind.execute(sa.text("""
+            UPDATE quiz_attempts AS a
+            SET quiz_session_id = b.id
+            FROM quiz_session_backfill AS b
+            WHERE a.id >= :low AND a.id < :high
+              AND b.user_id = a.user_id AND b.legacy_id = a.session_id
+        """), {"low": low, "high": low + BATCH_SIZE})
+    bind.execute(sa.text("DROP TABLE quiz_session_backfill"))
+
+    op.drop_column('quiz_attempts', 'session_id')
+    op.alter_column('quiz_attempts', 'quiz_session_id', new_column_name='session_id', nullable=False)
+    op.create_index('ix_quiz_attempts_user_id_session_id', 'quiz_attempts', ['user_id', 'session_id'], unique=False)
+    op.create_foreign_key('quiz_attempts_session_id_fkey', 'quiz_attempts', 'quiz_sessions', ['session_id'], ['id'])
+
+
+def downgrade() -> None:
+    # The attempts keep their new session IDs, which are still valid plain integers
+    op.drop_constraint('quiz_attempts_session_id_fkey', 'quiz_attempts', type_='foreignkey')
+    op.drop_index('ix_quiz_attempts_user_id_session_id', table_name='quiz_attempts')
+    op.drop_index(op.f('ix_quiz_sessions_user_id'), table_name='quiz_sessions')
+    op.drop_index(op.f('ix_quiz_sessions_id'), table_name='quiz_sessions')
+    op.drop_table('quiz_sessions')
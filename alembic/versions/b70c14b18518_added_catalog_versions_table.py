@@ -0,0 +1,31 @@
+"""added catalog_versions table
+
+Revision ID: b70c14b18518
+Revises: 71f06facbd5d
+Create Date: 2026-10-18 05:26:43.374287
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b70c14b18518'
+down_revision: Union[str, None] = '71f06facbd5d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('catalog_versions',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.execute("INSERT INTO catalog_versions (name, version) VALUES ('questions', 1)")
+
+
+def downgrade() -> None:
+    op.drop_table('catalog_versions')
@@ -0,0 +1,44 @@
+"""added default partition and aligned submitted_at
+
+Revision ID: d3a006f392c1
+Revises: 48f7508059e9
+Create Date: 2026-10-18 09:41:07.522913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3a006f392c1'
+down_revision: Union[str, None] = '48f7508059e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Catches attempts of months that have no partition yet, so an insert does
+    # not fail when partition maintenance falls behind; app/partitions.py moves
+    # them to their monthly partition on its next run
+    op.execute("CREATE TABLE quiz_attempts_default PARTITION OF quiz_attempts DEFAULT")
+
+    # Reviews look up a session's attempts by its submitted_at, which is now
+    # stamped with the attempts' attempted_at; sessions submitted before had
+    # the database's transaction time, a little earlier
+    op.execute("""
+        UPDATE quiz_sessions AS s
+        SET submitted_at = a.attempted_at
+        FROM (SELECT session_id, MIN(attempted_at) AS attempted_at FROM quiz_attempts GROUP BY session_id) AS a
+        WHERE a.session_id = s.id AND s.submitted_at IS NOT NULL AND s.submitted_at <> a.attempted_at
+    """)
+
+
+def downgrade() -> None:
+    # The aligned submitted_at times are kept. The default partition can only
+    # be dropped while it is empty: run partition maintenance first
+    bind = op.get_bind()
+    if bind.execute(sa.text("SELECT EXISTS (SELECT 1 FROM quiz_attempts_default)")).scalar():
+        raise RuntimeError("quiz_attempts_default is not empty; run python -m app.partitions first")
+    op.drop_table('quiz_attempts_default')
@@ -0,0 +1,187 @@
+import logging
+import threading
+from array import array
+from typing import NamedTuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.catalog import CATALOG_VERSION_QUERY, catalog_version
+from app.database import SessionLocal
+from app.models import Question
+
+NO_OPTION = -1  # stored when correct_option matches none of the four options
+
+KEY_COLUMNS = (
+    Question.id, Question.category, Question.difficulty,
+    Question.option_a, Question.option_b, Question.option_c, Question.option_d, Question.correct_option,
+)
+
+
+class AnswerKeyEntry(NamedTuple):
+    correct: int      # index of the correct option (0-3), or NO_OPTION
+    category: str
+    difficulty: str
+
+
+def correct_index(row) -> int:
+    """Returns the index of a question row's correct option among its four options."""
+    try:
+        return (row.option_a, row.option_b, row.option_c, row.option_d).index(row.correct_option)
+    except ValueError:
+        return NO_OPTION
+
+
+class AnswerKey:
+    """
+    Keeps what grading needs of every question in memory: the index of its
+    correct option and its category and difficulty, so a submission is graded
+    without reading the questions table.
+
+    Each question takes one slot in three parallel arrays (a byte for the
+    option, two 16-bit IDs into the interned category and difficulty names);
+    only the question ID to slot map is a dict. Slots of deleted questions are
+    reused.
+
+    The key is loaded at startup and kept up to date by the admin question
+    routes, whose own catalog version bumps advance() it without a reload.
+    Every lookup checks the stored catalog version: if another worker or an
+    import changed the bank, the submission is graded from the question rows
+    instead, and the key is reloaded on a background thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None  # catalog version the key is current for
+        self._generation = 0  # bumped by put() and discard(), so a reload that raced them is not kept
+        self._reloading = False
+        self._clear()
+
+    def _clear(self):
+        self._slots = {}              # question ID -> slot in the arrays below
+        self._correct = array("b")    # correct option index per slot
+        self._category = array("H")   # index into _names[0] per slot
+        self._difficulty = array("H")  # index into _names[1] per slot
+        self._free = []               # slots of deleted questions
+        self._names = ([], [])        # interned category and difficulty names
+        self._name_ids = ({}, {})
+
+    def _name_id(self, kind: int, name: str) -> int:
+        name_id = self._name_ids[kind].get(name)
+        if name_id is None:
+            name_id = self._name_ids[kind][name] = len(self._names[kind])
+            self._names[kind].append(name)
+        return name_id
+
+    def _put(self, question_id: int, correct: int, category: str, difficulty: str):
+        slot = self._slots.get(question_id)
+        values = (correct, self._name_id(0, category), self._name_id(1, difficulty))
+        if slot is None and self._free:
+            slot = self._free.pop()
+        if slot is None:
+            slot = len(self._correct)
+            self._correct.append(values[0])
+            self._category.append(values[1])
+            self._difficulty.append(values[2])
+        else:
+            self._correct[slot], self._category[slot], self._difficulty[slot] = values
+        self._slots[question_id] = slot
+
+    def _entry(self, slot: int) -> AnswerKeyEntry:
+        return AnswerKeyEntry(
+            self._correct[slot], self._names[0][self._category[slot]], self._names[1][self._difficulty[slot]]
+        )
+
+    def load(self, db: Session) -> bool:
+        """
+        Reloads the whole key from the questions table.
+
+        Returns:
+            bool: False if a local write changed the key during the scan, in
+                which case the result is dropped and the key stays as it was.
+        """
+        with self._lock:
+            generation = self._generation
+        # Read before the scan, so a change committed during it leaves the key stale, not wrong
+        version = catalog_version(db)
+        # Built aside and swapped in, so lookups are not held up by the scan
+        fresh = AnswerKey()
+        for row in db.execute(select(*KEY_COLUMNS).execution_options(yield_per=10000)):
+            fresh._put(row.id, correct_index(row), row.category, row.difficulty)
+        with self._lock:
+            if self._generation != generation:
+                return False
+            for name in ("_slots", "_correct", "_category", "_difficulty", "_free", "_names", "_name_ids"):
+                setattr(self, name, getattr(fresh, name))
+            self._version = version
+        return True
+
+    def _reload(self):
+        try:
+            with SessionLocal() as db:
+                self.load(db)
+        except Exception:
+            logging.exception("Reloading the answer key failed.")
+        finally:
+            with self._lock:
+                self._reloading = False
+
+    def sync(self, version: int):
+        """Starts a background reload if the key is not current for `version`."""
+        with self._lock:
+            if self._version == version or self._reloading:
+                return
+            self._reloading = True
+        threading.Thread(target=self._reload, name="answer-key-reload", daemon=True).start()
+
+    def advance(self, version: int):
+        """
+        Records that this worker's own write, already applied with put() or
+        discard(), produced catalog `version`. The key stays current only if it
+        was current for the version just before; otherwise a write from
+        elsewhere came in between and the key is left stale.
+        """
+        with self._lock:
+            if self._version is not None and self._version == version - 1:
+                self._version = version
+
+    def put(self, question_id: int, correct: int, category: str, difficulty: str):
+        """Registers a created or edited question."""
+        with self._lock:
+            self._put(question_id, correct, category, difficulty)
+            self._generation += 1
+
+    def discard(self, question_id: int):
+        """Forgets a deleted question."""
+        with self._lock:
+            slot = self._slots.pop(question_id, None)
+            if slot is not None:
+                self._free.append(slot)
+            self._generation += 1
+
+    def __len__(self):
+        return len(self._slots)
+
+    async def lookup(self, db: AsyncSession, question_ids) -> dict:
+        """
+        Returns the key entries of the given questions, after checking with one
+        primary-key read that the key is current for the stored catalog
+        version. A stale key is not used: the entries are read from the
+        questions table and a background reload is started.
+
+        Returns:
+            dict: Maps question ID to its AnswerKeyEntry; IDs that do not exist
+                are left out.
+        """
+        version = (await db.execute(CATALOG_VERSION_QUERY)).scalar() or 0
+        with self._lock:
+            if self._version == version:
+                return {
+                    question_id: self._entry(self._slots[question_id])
+                    for question_id in question_ids if question_id in self._slots
+                }
+        self.sync(version)
+        result = await db.execute(select(*KEY_COLUMNS).where(Question.id.in_(question_ids)))
+        return {row.id: AnswerKeyEntry(correct_index(row), row.category, row.difficulty) for row in result}
+
+
+answer_key = AnswerKey()
@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from sqlalchemy import insert
+from app.database import AsyncSessionLocal
+from app.models import QuizAttempt
+
+# Write-behind settings, overridable from the environment
+ATTEMPT_WRITE_BEHIND = os.getenv("ATTEMPT_WRITE_BEHIND", "false").lower() in ("1", "true", "yes")
+ATTEMPT_QUEUE_SIZE = int(os.getenv("ATTEMPT_QUEUE_SIZE", 10000))      # attempt rows held in memory at most
+ATTEMPT_BATCH_SIZE = int(os.getenv("ATTEMPT_BATCH_SIZE", 500))        # rows per multi-row INSERT
+ATTEMPT_FLUSH_INTERVAL = float(os.getenv("ATTEMPT_FLUSH_INTERVAL", 1.0))  # seconds a row may wait for a batch
+
+
+class AttemptWriter:
+    """
+    Write-behind buffer for the quiz_attempts log.
+
+    With write-behind enabled, a submission commits its quiz session, stats and
+    score as before, then hands its attempt rows to offer(). A flusher task on
+    the event loop writes them in multi-row INSERTs every `flush_interval`
+    seconds, or as soon as `batch_size` rows are waiting, so peak traffic turns
+    into a few large transactions instead of one per submission.
+
+    The buffer holds at most `max_rows` rows; offer() refuses a submission that
+    does not fit, and the caller writes it synchronously instead. stop() drains
+    the buffer before the engine is disposed. Rows still buffered when the
+    process dies are lost, which is why only the attempt log is deferred.
+    """
+
+    def __init__(self, enabled: bool, max_rows: int, batch_size: int, flush_interval: float):
+        self.enabled = enabled
+        self.max_rows = max_rows
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._rows = deque()
+        self._wake = None   # asyncio.Event, created on the loop by start()
+        self._task = None
+        self._stopping = False
+        self._stats = {
+            "enqueued": 0,
+            "rejected": 0,
+            "flushed": 0,
+            "batches": 0,
+            "failed": 0,
+            "flush_seconds_max": 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        """True while the flusher runs and offer() accepts rows."""
+        return self._task is not None
+
+    def offer(self, rows: list) -> bool:
+        """
+        Buffers the attempt rows of one submission, all or none.
+
+        Returns:
+            bool: False if write-behind is off or the rows do not fit, in which
+                case the caller must write them itself.
+        """
+        if not self.running:
+            return False
+        if len(self._rows) + len(rows) > self.max_rows:
+            self._stats["rejected"] += 1
+            logging.warning("Attempt write-behind queue full, writing synchronously.")
+            return False
+        self._rows.extend(rows)
+        self._stats["enqueued"] += len(rows)
+        if len(self._rows) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    async def _run(self):
+        while not (self._stopping and not self._rows):
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            while self._rows:
+                await self._flush_batch()
+
+    async def _flush_batch(self):
+        batch = [self._rows.popleft() for _ in range(min(self.batch_size, len(self._rows)))]
+        started = time.perf_counter()
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(QuizAttempt), batch)
+                await db.commit()
+        except Exception:
+            # One bad row (e.g. its question was deleted meanwhile) must not
+            # take the batch down with it; retry the rows one by one
+            logging.warning(f"Attempt batch of {len(batch)} rows failed, retrying row by row.")
+            await self._flush_rows(batch)
+        else:
+            self._stats["flushed"] += len(batch)
+        self._stats["batches"] += 1
+        self._stats["flush_seconds_max"] = max(self._stats["flush_seconds_max"], time.perf_counter() - started)
+
+    async def _flush_rows(self, rows: list):
+        for row in rows:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(insert(QuizAttempt), [row])
+                    await db.commit()
+            except Exception:
+                self._stats["failed"] += 1
+                logging.exception(f"Dropping quiz attempt that could not be written: {row}")
+            else:
+                self._stats["flushed"] += 1
+
+    def start(self):
+        """Starts the flusher on the running event loop, if write-behind is enabled."""
+        if self.enabled and self._task is None:
+            self._wake = asyncio.Event()
+            self._stopping = False
+            self._task = asyncio.create_task(self._run(), name="attempt-writer")
+
+    async def stop(self):
+        """Stops accepting rows and waits until every buffered row is written."""
+        task, self._task = self._task, None
+        if task is not None:
+            self._stopping = True
+            self._wake.set()
+            await task
+            logging.info(f"Attempt writer stopped: {self.stats()}")
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the queue depth and flush counters."""
+        return dict(self._stats, queued=len(self._rows), max_rows=self.max_rows, running=self.running)
+
+
+attempt_writer = AttemptWriter(ATTEMPT_WRITE_BEHIND, ATTEMPT_QUEUE_SIZE, ATTEMPT_BATCH_SIZE, ATTEMPT_FLUSH_INTERVAL)
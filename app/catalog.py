@@ -0,0 +1,99 @@
+import os
+import threading
+import time
+from typing import NamedTuple
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.models import CatalogVersion, Question
+
+# How often a worker asks the database whether its cached catalog is stale
+CATALOG_CHECK_INTERVAL = float(os.getenv("CATALOG_CHECK_INTERVAL", 5))
+QUESTIONS_CATALOG = "questions"
+CATALOG_VERSION_QUERY = select(CatalogVersion.version).where(CatalogVersion.name == QUESTIONS_CATALOG)
+
+
+class CatalogSnapshot(NamedTuple):
+    version: int
+    categories: list     # distinct categories, sorted
+    difficulties: list   # distinct difficulties, sorted
+    counts: dict         # (category, difficulty) -> number of questions
+
+
+def catalog_version(db: Session) -> int:
+    """Returns the stored version of the question bank; 0 if it was never changed."""
+    return db.execute(CATALOG_VERSION_QUERY).scalar() or 0
+
+
+def bump_catalog_version(db: Session) -> int:
+    """
+    Marks the question bank as changed. Call it inside the transaction that
+    changes the bank, then call question_catalog.invalidate() after the commit.
+
+    Returns:
+        int: The new version, which the in-memory caches this worker updated
+            itself can advance() to.
+    """
+    stmt = insert(CatalogVersion).values(name=QUESTIONS_CATALOG, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CatalogVersion.name],
+        set_={"version": CatalogVersion.version + 1},
+    )
+    return db.execute(stmt.returning(CatalogVersion.version)).scalar()
+
+
+class QuestionCatalog:
+    """
+    Caches the distinct categories, difficulties and per-pair question counts
+    that the home page offers, instead of scanning the questions table on every
+    view.
+
+    Each snapshot carries the catalog version it was built from. Writes in this
+    worker invalidate the cache directly; writes in other workers are picked up
+    when the stored version changes, which is checked at most once every
+    CATALOG_CHECK_INTERVAL seconds.
+    """
+
+    def __init__(self, check_interval: float = CATALOG_CHECK_INTERVAL):
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = 0.0
+        self._generation = 0  # bumped by invalidate() so in-flight reloads are not cached
+
+    def invalidate(self):
+        with self._lock:
+            self._snapshot = None
+            self._generation += 1
+
+    def get(self, db: Session) -> CatalogSnapshot:
+        now = time.monotonic()
+        with self._lock:
+            snapshot = self._snapshot
+            generation = self._generation
+            if snapshot is not None and now - self._checked_at < self.check_interval:
+                return snapshot
+
+        version = catalog_version(db)
+        if snapshot is None or snapshot.version != version:
+            counts = dict(
+                ((category, difficulty), count)
+                for category, difficulty, count in db.query(
+                    Question.category, Question.difficulty, func.count()
+                ).group_by(Question.category, Question.difficulty)
+            )
+            snapshot = CatalogSnapshot(
+                version=version,
+                categories=sorted({category for category, _ in counts}),
+                difficulties=sorted({difficulty for _, difficulty in counts}),
+                counts=counts,
+            )
+
+        with self._lock:
+            if self._generation == generation:
+                self._snapshot = snapshot
+                self._checked_at = now
+        return snapshot
+
+
+question_catalog = QuestionCatalog()
@@ -1,5 +1,9 @@
+from datetime import datetime
+from sqlalchemy import func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from app.models import User, Question
+from app.models import User, Question, QuizAttempt, QuizSession, UserQuizStats
 from app.schemas import UserCreate
 from app.utils import hash_password
 
@@ -17,4 +21,103 @@ def get_user_by_username(db: Session, username: str, email: str):
 def get_user_login(db: Session, username: str):
     return db.query(User).filter(User.username == username).first()
 
+def get_user_stats(db: Session, user_id: int):
+    """
+    Fetches one user's stats, plus per-category totals, in a single grouped query.
 
+    The lookup is served by the (user_id, category, difficulty) unique index and
+    only reads the columns the home page shows, so its cost does not depend on
+    how many other users exist.
+
+    Returns:
+        tuple: (stats, category_totals), where stats holds one row per
+            (category, difficulty) ordered by correct answers, and category_totals
+            holds one row per category with difficulty set to None.
+    """
+    rows = (
+        db.query(
+            UserQuizStats.category,
+            UserQuizStats.difficulty,
+            func.sum(UserQuizStats.solved_count).label("solved_count"),
+            func.sum(UserQuizStats.correct_count).label("correct_count"),
+            func.grouping(UserQuizStats.difficulty).label("is_total"),
+        )
+        .filter(UserQuizStats.user_id == user_id)
+        .group_by(func.grouping_sets(
+            tuple_(UserQuizStats.category, UserQuizStats.difficulty),
+            tuple_(UserQuizStats.category),
+        ))
+        .order_by(UserQuizStats.category)
+        .all()
+    )
+    stats = sorted((row for row in rows if not row.is_total), key=lambda row: row.correct_count, reverse=True)
+    category_totals = [row for row in rows if row.is_total]
+    return stats, category_totals
+
+def create_quiz_session(db: Session, user_id: int, category: str = None, difficulty: str = None):
+    """Opens a quiz session for the questions about to be handed out and returns its ID."""
+    quiz_session = QuizSession(user_id=user_id, category=category or None, difficulty=difficulty or None)
+    db.add(quiz_session)
+    db.commit()
+    return quiz_session.id
+
+async def submit_quiz_session(db: AsyncSession, user_id: int, session_id: int, score: int,
+                              submitted_at: datetime) -> bool:
+    """
+    Marks the user's open quiz session as submitted with its score. Pass the
+    attempted_at of its attempts as `submitted_at`: reviews find the attempts'
+    partition by it.
+
+    Returns:
+        bool: False if the session does not exist, belongs to another user or was
+            already submitted, in which case the submission must be rejected.
+    """
+    result = await db.execute(
+        update(QuizSession)
+        .where(QuizSession.id == session_id, QuizSession.user_id == user_id, QuizSession.submitted_at.is_(None))
+        .values(submitted_at=submitted_at, score=score)
+        .returning(QuizSession.id)
+    )
+    return result.scalar() is not None
+
+async def user_exists(db: AsyncSession, user_id: int) -> bool:
+    """Tells whether the user of a session token still exists; tokens are not checked against the database."""
+    result = await db.execute(select(User.id).where(User.id == user_id))
+    return result.scalar() is not None
+
+async def add_quiz_attempts(db: AsyncSession, attempts: list):
+    """Writes all attempts of a quiz submission with a single multi-row INSERT."""
+    if attempts:
+        await db.execute(insert(QuizAttempt), attempts)
+
+async def upsert_quiz_stats(db: AsyncSession, user_id: int, tallies: dict):
+    """
+    Adds the per-(category, difficulty) tallies of a quiz submission to the
+    user's stats with a single INSERT ... ON CONFLICT DO UPDATE.
+
+    Args:
+        db (AsyncSession): The database session.
+        user_id (int): The user who submitted the quiz.
+        tallies (dict): Maps (category, difficulty) to a (solved, correct) pair.
+    """
+    if not tallies:
+        return
+
+    stmt = insert(UserQuizStats).values([
+        {
+            "user_id": user_id,
+            "category": category,
+            "difficulty": difficulty,
+            "solved_count": solved,
+            "correct_count": correct,
+        }
+        for (category, difficulty), (solved, correct) in tallies.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        constraint="uq_user_quiz_stats_user_category_difficulty",
+        set_={
+            "solved_count": UserQuizStats.solved_count + stmt.excluded.solved_count,
+            "correct_count": UserQuizStats.correct_count + stmt.excluded.correct_count,
+        },
+    )
+    await db.execute(stmt)
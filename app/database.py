@@ -1,7 +1,12 @@
 import os
+import threading
+import time
 from sqlalchemy import create_engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from dotenv import load_dotenv
 
 
@@ -13,13 +18,116 @@ DB_HOST = os.getenv("DB_HOST")
 DB_PORT = os.getenv("DB_PORT")
 DB_NAME = os.getenv("DB_NAME")
 
+# Connection pool settings, overridable from the environment; each engine gets its own pool
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))  # seconds before a connection is replaced; -1 = never
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+DB_POOL_WARM_UP = int(os.getenv("DB_POOL_WARM_UP", DB_POOL_SIZE))  # connections opened at startup
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))  # 0 = no timeout
+
 
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+ASYNC_DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+
+class _TimedPoolMixin:
+    """Counts checkouts and the time callers spend waiting for a pooled connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._wait_stats = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+        }
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            with self._stats_lock:
+                self._wait_stats["timeouts"] += 1
+            raise
+        wait = time.perf_counter() - started
+        with self._stats_lock:
+            stats = self._wait_stats
+            stats["checkouts"] += 1
+            stats["wait_seconds_total"] += wait
+            stats["wait_seconds_max"] = max(stats["wait_seconds_max"], wait)
+        return connection
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            wait_stats = dict(self._wait_stats)
+        return dict(
+            wait_stats,
+            size=self.size(),
+            checked_out=self.checkedout(),
+            checked_in=self.checkedin(),
+            overflow=max(self.overflow(), 0),
+            max_overflow=self._max_overflow,
+        )
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
 
-engine = create_engine(DATABASE_URL)
+
+_pool_options = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=TimedQueuePool,
+    connect_args={"options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"} if DB_STATEMENT_TIMEOUT_MS else {},
+    **_pool_options,
+)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=True)
+
+# Async engine for the `async def` routes, so DB round trips do not block the event loop
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    poolclass=TimedAsyncQueuePool,
+    connect_args={"server_settings": {"statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)}} if DB_STATEMENT_TIMEOUT_MS else {},
+    **_pool_options,
+)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=True, expire_on_commit=False)
 Base = declarative_base()
 
+
+def warm_up_pool(count: int = DB_POOL_WARM_UP):
+    """Opens `count` connections on the sync pool, so the first requests do not pay for the connects."""
+    connections = [engine.connect() for _ in range(min(count, DB_POOL_SIZE))]
+    for connection in connections:
+        connection.close()
+
+async def warm_up_async_pool(count: int = DB_POOL_WARM_UP):
+    """Opens `count` connections on the async pool."""
+    connections = [await async_engine.connect() for _ in range(min(count, DB_POOL_SIZE))]
+    for connection in connections:
+        await connection.close()
+
+def pool_stats() -> dict:
+    """
+    Returns a snapshot of both connection pools: connections checked out and
+    idle, overflow in use, and how long callers waited for a connection.
+    """
+    return {"sync": engine.pool.stats(), "async": async_engine.sync_engine.pool.stats()}
+
 # Dependency to get a database session
 def get_db():
     db = SessionLocal()
@@ -27,3 +135,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Dependency to get an async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,120 @@
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Pool settings, overridable from the environment
+HASH_POOL_KIND = os.getenv("HASH_POOL_KIND", "process")  # "process" or "thread"
+HASH_POOL_SIZE = int(os.getenv("HASH_POOL_SIZE", os.cpu_count() or 1))
+HASH_POOL_MAX_PENDING = int(os.getenv("HASH_POOL_MAX_PENDING", HASH_POOL_SIZE * 4))
+
+
+def bcrypt_hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+def bcrypt_verify(plain_password: str, hashed_password: str) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+def _timed(func, *args):
+    # Runs inside the worker; time.monotonic() is system-wide on Linux, so the
+    # start time can be compared with the submit time taken in the parent
+    started = time.monotonic()
+    result = func(*args)
+    return result, started, time.monotonic() - started
+
+
+class HashingPool:
+    """
+    Runs bcrypt work on a dedicated, bounded executor so login and registration
+    storms cannot take over the web workers.
+
+    At most `max_pending` jobs may be queued or running at once. Further calls
+    fail fast with a 503 instead of piling up behind the pool.
+    """
+
+    def __init__(self, kind: str, size: int, max_pending: int):
+        self.kind = kind
+        self.size = size
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._stats = {
+            "in_flight": 0,  # queued or running
+            "completed": 0,
+            "rejected": 0,
+            "wait_seconds_total": 0.0,
+            "wait_seconds_max": 0.0,
+            "compute_seconds_total": 0.0,
+            "compute_seconds_max": 0.0,
+        }
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.kind == "process":
+                    # spawn avoids forking a process that already runs threads
+                    self._executor = ProcessPoolExecutor(self.size, mp_context=multiprocessing.get_context("spawn"))
+                else:
+                    self._executor = ThreadPoolExecutor(self.size, thread_name_prefix="hashing")
+            return self._executor
+
+    def warm_up(self):
+        """Starts the workers ahead of the first login so it does not pay the spawn cost."""
+        executor = self._get_executor()
+        for future in [executor.submit(time.monotonic) for _ in range(self.size)]:
+            future.result()
+
+    def run(self, func, *args):
+        """
+        Runs func(*args) on the pool and blocks the calling thread until it is done.
+
+        Raises:
+            HTTPException: 503 if the pool already has `max_pending` jobs in flight.
+        """
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["rejected"] += 1
+            logging.warning("Hashing pool saturated, rejecting request.")
+            raise HTTPException(status_code=503, detail="Server is busy, please try again.", headers={"Retry-After": "1"})
+
+        with self._lock:
+            self._stats["in_flight"] += 1
+        try:
+            submitted = time.monotonic()
+            result, started, compute = self._get_executor().submit(_timed, func, *args).result()
+        finally:
+            with self._lock:
+                self._stats["in_flight"] -= 1
+            self._slots.release()
+
+        wait = max(started - submitted, 0.0)
+        with self._lock:
+            stats = self._stats
+            stats["completed"] += 1
+            stats["wait_seconds_total"] += wait
+            stats["wait_seconds_max"] = max(stats["wait_seconds_max"], wait)
+            stats["compute_seconds_total"] += compute
+            stats["compute_seconds_max"] = max(stats["compute_seconds_max"], compute)
+        return result
+
+    def stats(self) -> dict:
+        """Returns a snapshot of the queue-wait, compute-time and saturation counters; /metrics exports them."""
+        with self._lock:
+            return dict(self._stats, size=self.size, max_pending=self.max_pending)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+            logging.info(f"Hashing pool stopped: {self.stats()}")
+
+
+hashing_pool = HashingPool(HASH_POOL_KIND, HASH_POOL_SIZE, HASH_POOL_MAX_PENDING)
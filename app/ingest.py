@@ -0,0 +1,194 @@
+import hashlib
+import html
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from sqlalchemy.dialects.postgresql import insert
+from app.catalog import bump_catalog_version, question_catalog
+from app.database import SessionLocal
+from app.models import Question
+
+DEFAULT_SOURCES = [
+    "https://opentdb.com/api.php?amount=50&category=18&type=multiple",
+    "https://opentdb.com/api.php?amount=50&category=9&type=multiple",
+    "https://opentdb.com/api.php?amount=50&category=23&type=multiple",
+]
+
+# Pipeline settings, overridable from the environment
+QUESTION_SOURCES = [url for url in os.getenv("QUESTION_SOURCES", ",".join(DEFAULT_SOURCES)).split(",") if url]
+INGEST_TIMEOUT = float(os.getenv("INGEST_TIMEOUT", 10))
+INGEST_RETRIES = int(os.getenv("INGEST_RETRIES", 3))
+INGEST_RETRY_DELAY = float(os.getenv("INGEST_RETRY_DELAY", 5))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", 500))
+INGEST_ON_STARTUP = os.getenv("INGEST_ON_STARTUP", "empty")  # "empty" (only if the bank is empty), "always" or "never"
+INGEST_INTERVAL = float(os.getenv("INGEST_INTERVAL", 0))  # seconds between runs; 0 = startup only
+
+# opentdb answers with this code when called again within its rate-limit window
+RATE_LIMITED = 5
+
+
+def question_content_hash(category: str, question_text: str, correct_answer: str) -> str:
+    """Identifies a question by its content, so the same question is only stored once."""
+    content = "\n".join((category, question_text, correct_answer)).lower()
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def fetch_source(url: str, timeout: float = INGEST_TIMEOUT, retries: int = INGEST_RETRIES,
+                 retry_delay: float = INGEST_RETRY_DELAY) -> list:
+    """
+    Fetches the raw question items of one opentdb-style source.
+
+    Returns:
+        list: The items of the response's "results" key; empty if the source failed.
+    """
+    for attempt in range(1, retries + 1):
+        try:
+            response = requests.get(url, timeout=timeout)
+            response.raise_for_status()
+            payload = response.json()
+        except (requests.exceptions.RequestException, ValueError) as e:
+            logging.warning(f"Fetching questions from {url} failed (attempt {attempt}): {e}")
+        else:
+            if payload.get("response_code") != RATE_LIMITED:
+                results = payload.get("results")
+                if not isinstance(results, list):
+                    logging.warning(f"No 'results' key found in the response from {url}")
+                    return []
+                return results
+            logging.info(f"Rate limited by {url} (attempt {attempt})")
+        if attempt < retries:
+            time.sleep(retry_delay * attempt)
+    return []
+
+
+def normalize_item(item: dict):
+    """
+    Turns one raw source item into a questions row: decodes HTML entities,
+    shuffles the options and computes the content hash.
+
+    Returns:
+        dict: The row to insert, or None if the item is not a 4-option question.
+    """
+    try:
+        question_text = html.unescape(item["question"]).strip()
+        correct_answer = html.unescape(item["correct_answer"]).strip()
+        incorrect_answers = [html.unescape(answer).strip() for answer in item["incorrect_answers"]]
+    except (KeyError, TypeError):
+        return None
+
+    all_answers = [correct_answer] + incorrect_answers
+    if len(all_answers) != 4 or not question_text:
+        return None
+    random.shuffle(all_answers)
+
+    # Decoded and stripped like the other fields; migration 48f7508059e9 hashed the legacy rows the same way
+    category = html.unescape(item.get("category") or "").strip() or "General Knowledge"
+    difficulty = html.unescape(item.get("difficulty") or "").strip() or "easy"
+    return {
+        "category": category,
+        "difficulty": difficulty,
+        "question_text": question_text,
+        "option_a": all_answers[0],
+        "option_b": all_answers[1],
+        "option_c": all_answers[2],
+        "option_d": all_answers[3],
+        "correct_option": correct_answer,
+        "admincreated": False,
+        "content_hash": question_content_hash(category, question_text, correct_answer),
+    }
+
+
+def ingest_questions(sources: list = None, session_factory=SessionLocal, batch_size: int = INGEST_BATCH_SIZE,
+                     timeout: float = INGEST_TIMEOUT) -> int:
+    """
+    Runs one pass of the ingestion pipeline: fetches every source concurrently,
+    normalizes and de-duplicates the items, and bulk-inserts them in batches.
+    Questions whose content hash is already stored are skipped.
+
+    Args:
+        sources (list): The source URLs; QUESTION_SOURCES if omitted.
+        session_factory (callable): Creates the database session to write with.
+        batch_size (int): The number of rows per INSERT statement.
+        timeout (float): The per-request HTTP timeout in seconds.
+
+    Returns:
+        int: The number of questions added to the bank.
+    """
+    sources = QUESTION_SOURCES if sources is None else sources
+    if not sources:
+        return 0
+
+    with ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="ingest") as pool:
+        responses = list(pool.map(lambda url: fetch_source(url, timeout=timeout), sources))
+
+    rows = {}
+    for items in responses:
+        for item in items:
+            row = normalize_item(item)
+            if row is not None:
+                rows.setdefault(row["content_hash"], row)
+    rows = list(rows.values())
+
+    added = 0
+    with session_factory() as db:
+        for start in range(0, len(rows), batch_size):
+            stmt = (
+                insert(Question)
+                .values(rows[start:start + batch_size])
+                .on_conflict_do_nothing(index_elements=[Question.content_hash])
+                .returning(Question.id)
+            )
+            added += len(db.execute(stmt).all())
+        if added:
+            # Let every worker's catalog cache and question sampler pick up the new bank
+            bump_catalog_version(db)
+        db.commit()
+
+    if added:
+        question_catalog.invalidate()
+    logging.info(f"Question ingestion fetched {len(rows)} unique questions from {len(sources)} sources, added {added}.")
+    return added
+
+
+class IngestionScheduler:
+    """Runs the ingestion pipeline on a background thread, off the request path."""
+
+    def __init__(self, interval: float = INGEST_INTERVAL, on_start: str = INGEST_ON_STARTUP):
+        self.interval = interval
+        self.on_start = on_start
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        if self.on_start != "never":
+            self._run_once(only_if_empty=self.on_start == "empty")
+        while self.interval > 0 and not self._stop.wait(self.interval):
+            self._run_once()
+
+    def _run_once(self, only_if_empty: bool = False):
+        try:
+            if only_if_empty:
+                with SessionLocal() as db:
+                    if db.query(Question.id).first() is not None:
+                        return
+            ingest_questions()
+        except Exception:
+            logging.exception("Question ingestion failed.")
+
+    def start(self):
+        if self._thread is None and (self.on_start != "never" or self.interval > 0):
+            self._thread = threading.Thread(target=self._run, name="question-ingestion", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=INGEST_TIMEOUT)
+            self._thread = None
+
+
+ingestion_scheduler = IngestionScheduler()
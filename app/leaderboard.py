@@ -0,0 +1,91 @@
+import threading
+from bisect import bisect_left, insort
+from typing import NamedTuple
+from sqlalchemy.orm import Session
+from app.models import User
+
+
+class LeaderboardEntry(NamedTuple):
+    user_id: int
+    username: str
+    score: int
+
+
+class Leaderboard:
+    """
+    Keeps every user ordered by score in memory, so the home page never has to
+    sort the users table.
+
+    Users are stored as (-score, user_id) keys in a sorted list. Ranks and page
+    boundaries are found by binary search in O(log n); moving a user costs one
+    bisect plus a memmove of the list tail. The board is rebuilt from the
+    database at startup and then updated by the routes that change a score.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = []   # sorted (-score, user_id)
+        self._users = {}  # user_id -> (username, score)
+
+    def rebuild(self, db: Session):
+        """Reloads the whole board from the users table."""
+        users = {
+            user_id: (username, score or 0)
+            for user_id, username, score in db.query(User.id, User.username, User.score)
+        }
+        keys = sorted((-score, user_id) for user_id, (_, score) in users.items())
+        with self._lock:
+            self._users, self._keys = users, keys
+
+    def _discard(self, user_id: int):
+        current = self._users.pop(user_id, None)
+        if current is not None:
+            key = (-current[1], user_id)
+            del self._keys[bisect_left(self._keys, key)]
+
+    def set_score(self, user_id: int, username: str, score: int):
+        """Inserts a user or moves them to their new score."""
+        with self._lock:
+            self._discard(user_id)
+            self._users[user_id] = (username, score)
+            insort(self._keys, (-score, user_id))
+
+    def remove(self, user_id: int):
+        with self._lock:
+            self._discard(user_id)
+
+    def _entry(self, key):
+        score, user_id = -key[0], key[1]
+        return LeaderboardEntry(user_id, self._users[user_id][0], score)
+
+    def page(self, offset: int = 0, limit: int = 5) -> list:
+        """Returns `limit` entries starting at the 0-based position `offset`."""
+        with self._lock:
+            return [self._entry(key) for key in self._keys[offset:offset + limit]]
+
+    def top(self, limit: int = 5) -> list:
+        return self.page(0, limit)
+
+    def get(self, user_id: int):
+        """Returns the user's LeaderboardEntry, or None if the user is not on the board."""
+        with self._lock:
+            current = self._users.get(user_id)
+            return LeaderboardEntry(user_id, *current) if current is not None else None
+
+    def rank(self, user_id: int):
+        """
+        Returns the 1-based rank of a user, with tied scores sharing a rank,
+        or None if the user is not on the board.
+        """
+        with self._lock:
+            current = self._users.get(user_id)
+            if current is None:
+                return None
+            # Number of users with a strictly higher score, plus one
+            return bisect_left(self._keys, (-current[1],)) + 1
+
+    def __len__(self):
+        return len(self._keys)
+
+
+leaderboard = Leaderboard()
@@ -0,0 +1,176 @@
+"""
+Bulk-loads questions from a JSON Lines or CSV file with Postgres COPY.
+
+    python -m app.loader questions.jsonl
+    python -m app.loader questions.csv --chunk-size 50000
+
+Each row needs the columns category, difficulty, question_text, option_a,
+option_b, option_c, option_d and correct_option. correct_option may be the
+answer text or one of the letters A-D. Rows are validated while the file is
+streamed, copied in chunks into a temporary staging table and merged into
+questions, skipping questions that are already stored (by content hash).
+"""
+import argparse
+import csv
+import io
+import json
+import logging
+import sys
+import time
+from app.catalog import bump_catalog_version, question_catalog
+from app.database import SessionLocal
+from app.ingest import question_content_hash
+from app.models import Question
+
+# The columns a row must provide: every non-nullable column without a default
+REQUIRED_COLUMNS = [
+    column.name for column in Question.__table__.columns
+    if not column.nullable and not column.primary_key and column.default is None and column.server_default is None
+]
+OPTION_COLUMNS = ["option_a", "option_b", "option_c", "option_d"]
+STAGED_COLUMNS = REQUIRED_COLUMNS + ["content_hash"]
+MAX_REPORTED_ERRORS = 20
+
+CREATE_STAGING = f"""
+    CREATE TEMP TABLE questions_staging ({", ".join(f"{name} text" for name in STAGED_COLUMNS)})
+    ON COMMIT DROP
+"""
+MERGE_STAGING = f"""
+    INSERT INTO questions ({", ".join(STAGED_COLUMNS)}, admincreated)
+    SELECT DISTINCT ON (content_hash) {", ".join(STAGED_COLUMNS)}, false
+    FROM questions_staging
+    ON CONFLICT (content_hash) DO NOTHING
+"""
+
+
+class InvalidRow(ValueError):
+    pass
+
+
+def read_rows(path: str, file_format: str):
+    """Streams (row, error) pairs from the input file; blank JSON lines yield (None, None)."""
+    with open(path, newline="", encoding="utf-8") as source:
+        if file_format == "csv":
+            for row in csv.DictReader(source):
+                yield row, None
+        else:
+            for line in source:
+                if not line.strip():
+                    yield None, None
+                    continue
+                try:
+                    yield json.loads(line), None
+                except ValueError as e:
+                    yield None, f"invalid JSON: {e}"
+
+
+def validate_row(row) -> list:
+    """
+    Checks a row against the Question model's required columns and returns the
+    values to stage, in STAGED_COLUMNS order.
+    """
+    if not isinstance(row, dict):
+        raise InvalidRow("row is not an object")
+
+    values = {}
+    for name in REQUIRED_COLUMNS:
+        value = row.get(name)
+        if not isinstance(value, str) or not value.strip():
+            raise InvalidRow(f"missing or empty column '{name}'")
+        values[name] = value.strip()
+
+    # Accept the answer letter as well as the answer text
+    letter = values["correct_option"].lower()
+    if len(letter) == 1 and f"option_{letter}" in values:
+        values["correct_option"] = values[f"option_{letter}"]
+    if values["correct_option"] not in (values[name] for name in OPTION_COLUMNS):
+        raise InvalidRow("correct_option does not match any option")
+
+    values["content_hash"] = question_content_hash(
+        values["category"], values["question_text"], values["correct_option"]
+    )
+    return [values[name] for name in STAGED_COLUMNS]
+
+
+def copy_chunk(cursor, rows: list) -> int:
+    """COPYs one chunk into the staging table, merges it and returns the rows inserted."""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY questions_staging ({', '.join(STAGED_COLUMNS)}) FROM STDIN WITH (FORMAT csv)", buffer)
+    cursor.execute(MERGE_STAGING)
+    inserted = cursor.rowcount
+    cursor.execute("TRUNCATE questions_staging")
+    return inserted
+
+
+def load_file(path: str, file_format: str, chunk_size: int = 10000, max_errors: int = 1000) -> dict:
+    """
+    Loads a question file in a single transaction. Only one chunk is held in
+    memory at a time, so memory use does not depend on the file size.
+
+    Returns:
+        dict: Counters for rows read, rejected, inserted and skipped as duplicates.
+    """
+    stats = {"read": 0, "rejected": 0, "inserted": 0, "duplicates": 0}
+    started = time.perf_counter()
+
+    with SessionLocal() as db:
+        cursor = db.connection().connection.cursor()
+        cursor.execute(CREATE_STAGING)
+
+        chunk = []
+        for line_number, (row, error) in enumerate(read_rows(path, file_format), start=1):
+            if row is None and error is None:
+                continue
+            stats["read"] += 1
+            try:
+                if error:
+                    raise InvalidRow(error)
+                chunk.append(validate_row(row))
+            except InvalidRow as e:
+                stats["rejected"] += 1
+                if stats["rejected"] <= MAX_REPORTED_ERRORS:
+                    logging.warning(f"Skipping row {line_number}: {e}")
+                if stats["rejected"] > max_errors:
+                    db.rollback()
+                    raise SystemExit(f"Aborted: more than {max_errors} invalid rows, nothing was loaded.")
+                continue
+
+            if len(chunk) >= chunk_size:
+                stats["inserted"] += copy_chunk(cursor, chunk)
+                chunk = []
+                elapsed = time.perf_counter() - started
+                logging.info(f"{stats['read']} rows read, {stats['inserted']} inserted ({stats['read'] / elapsed:,.0f} rows/s)")
+
+        if chunk:
+            stats["inserted"] += copy_chunk(cursor, chunk)
+        stats["duplicates"] = stats["read"] - stats["rejected"] - stats["inserted"]
+
+        if stats["inserted"]:
+            bump_catalog_version(db)
+        db.commit()
+
+    question_catalog.invalidate()
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    stats["rows_per_second"] = round(stats["read"] / stats["seconds"]) if stats["seconds"] else stats["read"]
+    return stats
+
+
+def main():
+    logging.basicConfig(format="{asctime} | {levelname} | {message}", datefmt="%d-%b-%y %H:%M:%S", level=20, style="{")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", help="the JSON Lines or CSV file to load")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="rows per COPY")
+    parser.add_argument("--max-errors", type=int, default=1000, help="abort after this many invalid rows")
+    args = parser.parse_args()
+
+    file_format = args.format or ("csv" if args.path.lower().endswith(".csv") else "jsonl")
+    stats = load_file(args.path, file_format, chunk_size=args.chunk_size, max_errors=args.max_errors)
+    print(json.dumps(stats))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+Non-blocking, structured logging for the web app.
+
+configure_logging() is called once by app/main.py. It routes every record on
+the root logger through a QueueHandler, so a request thread only filters the
+record and puts it on an in-memory queue; a QueueListener thread formats it
+and writes it to stderr. When the queue is full, records are dropped and
+counted instead of blocking the request.
+
+Records are written as one JSON object per line (LOG_FORMAT=json, the
+default) or as plain text (LOG_FORMAT=text). Records logged while serving a
+request carry its method, route template and user ID, and each request ends
+with a "request" record holding its status, latency and database cost.
+
+High-volume INFO records can be sampled per event. A record's event is the
+name of the function that logged it (e.g. login_page, start_quiz), or
+"request" for the per-request record:
+
+    LOG_SAMPLING="request=0.1,login_page=0.01"
+
+keeps about 10% of the request records and 1% of the login page lines.
+Warnings and errors are never sampled.
+"""
+import atexit
+import copy
+import logging
+import os
+import queue
+import random
+import sys
+import time
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+import orjson
+from app.metrics import UNMATCHED_ROUTE, current_request_cost
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")  # "json" or "text"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))
+LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")  # event=rate pairs, e.g. "request=0.1,login_page=0.01"
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_STANDARD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+# The ASGI scope of the request being served, set by RequestLogMiddleware
+_request_scope: ContextVar = ContextVar("request_scope", default=None)
+
+access_logger = logging.getLogger("app.access")
+
+
+def parse_sampling(text: str) -> dict:
+    """Parses "event=rate,..." into {event: rate}, with rates clamped to [0, 1]."""
+    rates = {}
+    for item in filter(None, (part.strip() for part in text.split(","))):
+        event, _, rate = item.partition("=")
+        rates[event.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+def record_event(record: logging.LogRecord) -> str:
+    return getattr(record, "event", None) or record.funcName
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps records logged while serving a request with its method, route and user ID."""
+
+    def filter(self, record):
+        scope = _request_scope.get()
+        if scope is not None:
+            record.method = scope["method"]
+            record.route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            user_id = scope.get("state", {}).get("user_id")
+            if user_id is not None:
+                record.user_id = user_id
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps INFO and lower records of a sampled event with the configured probability."""
+
+    def __init__(self, rates: dict):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if record.levelno > logging.INFO or not self.rates:
+            return True
+        rate = self.rates.get(record_event(record))
+        return rate is None or random.random() < rate
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """A QueueHandler that drops records when its bounded queue is full, instead of waiting."""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # Only what must happen on the calling thread: resolve the message
+        # arguments and render the traceback, which cannot be pickled or
+        # outlive the frame. JSON formatting happens on the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as a single-line JSON object, including its `extra` fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "event": record_event(record),
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRIBUTES and key != "event":
+                entry[key] = value
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return orjson.dumps(entry, default=str).decode()
+
+    def formatTime(self, record, datefmt=None):
+        return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z"
+
+
+class TextFormatter(logging.Formatter):
+    """The format the app has always logged in, with the request context appended when present."""
+
+    def __init__(self):
+        super().__init__("{asctime} | {levelname} | {message}", datefmt="%d-%b-%y %H:%M:%S", style="{")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = {key: value for key, value in vars(record).items() if key not in _STANDARD_ATTRIBUTES}
+        if fields:
+            line += " | " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+_listener = None
+_queue_handler = None
+
+
+def configure_logging(level: str = LOG_LEVEL, log_format: str = LOG_FORMAT, sampling: str = LOG_SAMPLING,
+                      queue_size: int = LOG_QUEUE_SIZE):
+    """
+    Sends the root logger's records through a bounded queue to a background
+    writer thread. Safe to call more than once; later calls do nothing.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stderr)
+    output.setFormatter(JsonFormatter() if log_format == "json" else TextFormatter())
+
+    _queue_handler = NonBlockingQueueHandler(queue.Queue(queue_size))
+    _queue_handler.addFilter(SamplingFilter(parse_sampling(sampling)))
+    _queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(_queue_handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+
+def stop_logging():
+    """Writes out the records still queued and stops the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        if _queue_handler.dropped:
+            sys.stderr.write(f"Logging queue was full, {_queue_handler.dropped} records dropped\n")
+
+
+def dropped_records() -> int:
+    return _queue_handler.dropped if _queue_handler is not None else 0
+
+
+class RequestLogMiddleware:
+    """
+    Plain ASGI middleware that exposes the request to RequestContextFilter
+    and logs one "request" record per HTTP request with its status, latency
+    and database cost. It must run inside MetricsMiddleware, which counts the
+    request's statements.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = _request_scope.set(scope)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            latency = time.perf_counter() - started
+            cost = current_request_cost.get()
+            extra = {"event": "request", "status": status, "latency_ms": round(latency * 1000, 2)}
+            if cost is not None:
+                extra["queries"] = cost.queries
+                extra["db_ms"] = round(cost.db_seconds * 1000, 2)
+            if access_logger.isEnabledFor(logging.INFO):
+                access_logger.info(f"{scope['method']} {scope['path']} {status}", extra=extra)
+            _request_scope.reset(token)
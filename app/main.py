@@ -1,11 +1,111 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+from app.answerkey import answer_key
+from app.attempts import attempt_writer
+from app.database import SessionLocal, engine, async_engine, pool_stats, warm_up_pool, warm_up_async_pool
+from app.hashing import hashing_pool
+from app.ingest import ingestion_scheduler
+from app.leaderboard import leaderboard
+from app.logconfig import RequestLogMiddleware, configure_logging, dropped_records
+from app.metrics import MetricsMiddleware, instrument_engine, metrics_registry
+from app.partitions import partition_maintenance
+from app.querydebug import QUERY_DEBUG, QueryDebugMiddleware, install_query_hooks
 from app.routes import auth
 from app.routes import admin
+from app.routes import api
+from app.utils import check_secret_key
 
-app = FastAPI()
+# Logging is set up once, here: records go through a queue to a background writer
+configure_logging()
+
+
+def rebuild_leaderboard():
+    with SessionLocal() as db:
+        leaderboard.rebuild(db)
+
+
+def load_answer_key():
+    with SessionLocal() as db:
+        answer_key.load(db)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    check_secret_key()
+    await asyncio.to_thread(warm_up_pool)
+    await warm_up_async_pool()
+    await asyncio.to_thread(hashing_pool.warm_up)
+    await asyncio.to_thread(rebuild_leaderboard)
+    await asyncio.to_thread(load_answer_key)
+    ingestion_scheduler.start()
+    partition_maintenance.start()
+    attempt_writer.start()
+    yield
+    ingestion_scheduler.stop()
+    partition_maintenance.stop()
+    # Deferred quiz attempts are written before the engines go away
+    await attempt_writer.stop()
+    hashing_pool.shutdown()
+    logging.info(f"Database pools stopped: {pool_stats()}")
+    await async_engine.dispose()
+    engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan)
+
+# One structured log record per request; added first so it runs inside
+# MetricsMiddleware and can report the request's query count
+app.add_middleware(RequestLogMiddleware)
+
+# Per-route latency and DB cost histograms, served at /metrics
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+
+# Development only: warn about repeated statement shapes (likely N+1 queries)
+if QUERY_DEBUG:
+    install_query_hooks(engine, async_engine.sync_engine)
+    app.add_middleware(QueryDebugMiddleware)
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Serves the request and connection-pool metrics of this worker in the
+    Prometheus text format. Async, so it runs on the event loop thread like the
+    middleware that records the metrics, and never sees them half-updated.
+    """
+    pools = pool_stats()
+    gauges = {
+        f"quiz_db_pool_{key}": (help_text, [({"pool": pool}, stats[key]) for pool, stats in pools.items()])
+        for key, help_text in (
+            ("checked_out", "Connections currently checked out of the pool."),
+            ("checked_in", "Idle connections held by the pool."),
+            ("overflow", "Connections open beyond the pool size."),
+        )
+    }
+    gauges["quiz_attempt_queue_rows"] = ("Quiz attempts waiting for the write-behind flusher.",
+                                         [({}, attempt_writer.stats()["queued"])])
+    hashing = hashing_pool.stats()
+    for name, key, help_text in (
+        ("quiz_hashing_pool_in_flight", "in_flight", "Password hashing jobs queued or running."),
+        ("quiz_hashing_pool_max_pending", "max_pending", "Hashing jobs allowed in flight before requests get a 503."),
+        ("quiz_hashing_pool_completed_total", "completed", "Password hashing jobs completed."),
+        ("quiz_hashing_pool_rejected_total", "rejected", "Requests rejected with a 503 because the hashing pool was full."),
+        ("quiz_hashing_pool_wait_seconds_total", "wait_seconds_total", "Time hashing jobs spent queued for a worker."),
+        ("quiz_hashing_pool_compute_seconds_total", "compute_seconds_total", "Time hashing jobs spent running."),
+    ):
+        gauges[name] = (help_text, [({}, hashing[key])])
+    gauges["quiz_log_records_dropped"] = ("Log records dropped because the logging queue was full.",
+                                          [({}, dropped_records())])
+    return PlainTextResponse(metrics_registry.render(gauges), media_type="text/plain; version=0.0.4")
 
 app.include_router(auth.router)
 app.include_router(admin.router)
+app.include_router(api.router)
 
 # @app.get("/")
 # def home():
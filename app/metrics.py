@@ -0,0 +1,182 @@
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from sqlalchemy import event
+
+# Histogram bucket upper bounds; +Inf is implied
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+UNMATCHED_ROUTE = "<unmatched>"  # one label for every 404, so random paths cannot add series
+
+
+class RequestCost:
+    """The database work done on behalf of one request."""
+    __slots__ = ("queries", "db_seconds")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# Set by the middleware for the duration of a request; sync routes run in a
+# threadpool that inherits the context, so their queries are counted too
+current_request_cost: ContextVar = ContextVar("current_request_cost", default=None)
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # per bucket, not cumulative; the last one is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class RouteMetrics:
+    __slots__ = ("latency", "queries", "db_seconds", "statuses")
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_seconds = Histogram(LATENCY_BUCKETS)
+        self.statuses = {}  # status code -> requests
+
+
+class MetricsRegistry:
+    """
+    Per-route request metrics of this worker.
+
+    observe() is only called from the middleware, which runs on the event loop
+    thread, so recording needs no lock: it is a dict lookup, three bisects and
+    a few integer increments. render() must run on the loop too (the /metrics
+    route is async for that reason), so it never iterates a dict that observe()
+    is changing.
+    """
+
+    def __init__(self):
+        self._routes = {}  # (method, route template) -> RouteMetrics
+
+    def observe(self, method: str, route: str, status: int, seconds: float, cost: RequestCost):
+        metrics = self._routes.get((method, route))
+        if metrics is None:
+            metrics = self._routes[(method, route)] = RouteMetrics()
+        metrics.latency.observe(seconds)
+        metrics.queries.observe(cost.queries)
+        metrics.db_seconds.observe(cost.db_seconds)
+        metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+
+    def render(self, gauges: dict = None) -> str:
+        """
+        Formats the metrics in the Prometheus text exposition format.
+
+        Args:
+            gauges (dict): Extra gauges to append, as name -> (help, [(labels dict, value)]).
+        """
+        lines = []
+        histograms = (
+            ("quiz_http_request_duration_seconds", "Request latency by route.", "latency"),
+            ("quiz_http_request_db_queries", "Database statements issued per request.", "queries"),
+            ("quiz_http_request_db_seconds", "Time spent in database statements per request.", "db_seconds"),
+        )
+        routes = sorted(self._routes.items())
+        for name, help_text, attribute in histograms:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (method, route), metrics in routes:
+                histogram = getattr(metrics, attribute)
+                labels = f'method="{method}",route="{_escape(route)}"'
+                cumulative = 0
+                for bound, count in zip(histogram.bounds + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"{name}_sum{{{labels}}} {histogram.total}")
+                lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+        lines.append("# HELP quiz_http_requests_total Requests by route and status code.")
+        lines.append("# TYPE quiz_http_requests_total counter")
+        for (method, route), metrics in routes:
+            for status, count in sorted(metrics.statuses.items()):
+                lines.append(
+                    f'quiz_http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}'
+                )
+
+        for name, (help_text, samples) in (gauges or {}).items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware that times every HTTP request and records it under its
+    route template (e.g. /admin/edit/{user_id}) together with the database work
+    it caused.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cost = RequestCost()
+        token = current_request_cost.set(cost)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            current_request_cost.reset(token)
+            # The router stores the matched route in the (shared) scope
+            route = scope.get("route")
+            self.registry.observe(scope["method"], getattr(route, "path", UNMATCHED_ROUTE), status, elapsed, cost)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if current_request_cost.get() is not None:
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    cost = current_request_cost.get()
+    if cost is not None and conn.info.get("query_started"):
+        cost.queries += 1
+        cost.db_seconds += time.perf_counter() - conn.info["query_started"].pop()
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    connection = exception_context.connection
+    if exception_context.execution_context is not None and connection is not None and connection.info.get("query_started"):
+        connection.info["query_started"].pop()
+
+def instrument_engine(engine):
+    """Attributes the statements run on `engine` (a sync Engine) to the current request."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+metrics_registry = MetricsRegistry()
@@ -1,6 +1,8 @@
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import event, Column, Integer, BigInteger, SmallInteger, String, Text, Boolean, DateTime, ForeignKey, UniqueConstraint, Computed, Index, func
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import relationship, deferred
 from app.database import Base
+from app.partitions import ensure_partitions
 
 class User(Base):
     __tablename__ = "users"
@@ -14,12 +16,22 @@ class User(Base):
 
     # Relationship to link user attempts
     attempts = relationship("QuizAttempt", back_populates="user")
+    quiz_sessions = relationship("QuizSession", back_populates="user")
     quiz_stats = relationship("UserQuizStats", back_populates="user")
 
 
 
 class Question(Base):
     __tablename__ = "questions"
+    __table_args__ = (
+        # Full-text search over the text, category and difficulty, plus trigram
+        # indexes so substring (ILIKE '%term%') searches can use an index too
+        Index("ix_questions_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ix_questions_question_text_trgm", "question_text", postgresql_using="gin",
+              postgresql_ops={"question_text": "gin_trgm_ops"}),
+        Index("ix_questions_category_trgm", "category", postgresql_using="gin",
+              postgresql_ops={"category": "gin_trgm_ops"}),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     category = Column(String, nullable=False)
@@ -31,25 +43,69 @@ class Question(Base):
     option_d = Column(String, nullable=False)
     correct_option = Column(String, nullable=False) 
     admincreated = Column(Boolean, nullable=False, default=False)
+    content_hash = Column(String(64), unique=True, index=True)  # set for imported questions, used to skip duplicates
+    # Only used in WHERE / ORDER BY clauses, so it is never loaded with the row
+    search_vector = deferred(Column(TSVECTOR, Computed(
+        "setweight(to_tsvector('english', question_text), 'A') || "
+        "setweight(to_tsvector('english', category || ' ' || difficulty), 'B')",
+        persisted=True,
+    )))
 
     # Relationship to link question attempts
     attempts = relationship("QuizAttempt", back_populates="question")
 
+# The admin search lists a difficulty's questions when its name is searched
+Index("ix_questions_difficulty_lower", func.lower(Question.difficulty))
 
-class QuizAttempt(Base):
-    __tablename__ = "quiz_attempts"
 
+class QuizSession(Base):
+    __tablename__ = "quiz_sessions"
+
+    # One row per quiz handed out by /questions; submitted_at and score stay
+    # NULL until the quiz is submitted, which can happen only once
     id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    category = Column(String, nullable=True)
+    difficulty = Column(String, nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    submitted_at = Column(DateTime(timezone=True), nullable=True)
+    score = Column(Integer, nullable=True)
+
+    # Relationships
+    user = relationship("User", back_populates="quiz_sessions")
+    attempts = relationship("QuizAttempt", back_populates="session")
+
+class QuizAttempt(Base):
+    __tablename__ = "quiz_attempts"
+    __table_args__ = (
+        # Backs the review lookup, which filters on both columns
+        Index("ix_quiz_attempts_user_id_session_id", "user_id", "session_id"),
+        # One partition per month, created ahead of time by app/partitions.py;
+        # the partition key has to be part of the primary key
+        {"postgresql_partition_by": "RANGE (attempted_at)"},
+    )
+
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     question_id = Column(Integer, ForeignKey("questions.id"), nullable=False)
-    user_answer = Column(String, nullable=True)  
-    correct_answer = Column(String, nullable=False)  
+    # Indexes (0-3) into the question's options, not copies of their text;
+    # user_option is None when the question was left unanswered
+    user_option = Column(SmallInteger, nullable=True)
+    correct_option = Column(SmallInteger, nullable=False)
     is_correct = Column(Boolean, default=False)  
-    session_id = Column(Integer, nullable=False) 
+    session_id = Column(Integer, ForeignKey("quiz_sessions.id"), nullable=False) 
+    attempted_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
 
     # Relationships
     user = relationship("User", back_populates="attempts")
     question = relationship("Question", back_populates="attempts")
+    session = relationship("QuizSession", back_populates="attempts")
+
+# Tables made by create_all() (benchmarks, scratch databases) get their monthly
+# partitions right away; migrated databases get them from the migration
+@event.listens_for(QuizAttempt.__table__, "after_create")
+def create_attempt_partitions(target, connection, **kw):
+    ensure_partitions(connection)
 
 class Admin(Base):
     __tablename__ = "admins"
@@ -60,6 +116,10 @@ class Admin(Base):
 
 class UserQuizStats(Base):
     __tablename__ = "user_quiz_stats"
+    __table_args__ = (
+        # One row per user and (category, difficulty) pair; backs the stats upsert
+        UniqueConstraint("user_id", "category", "difficulty", name="uq_user_quiz_stats_user_category_difficulty"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -69,4 +129,13 @@ class UserQuizStats(Base):
     correct_count = Column(Integer, default=0)
     
     # Relationship to link user stats
-    user = relationship("User", back_populates="quiz_stats")
\ No newline at end of file
+    user = relationship("User", back_populates="quiz_stats")
+
+
+class CatalogVersion(Base):
+    __tablename__ = "catalog_versions"
+
+    # Bumped whenever the data behind a cached catalog changes, so every worker
+    # can detect a stale cache with a primary-key lookup
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=1)
@@ -0,0 +1,90 @@
+import base64
+import json
+from typing import NamedTuple
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, text
+from sqlalchemy.orm import Query, Session
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class Page(NamedTuple):
+    rows: list
+    next_cursor: str  # None on the last page
+
+
+def clamp_page_size(page_size: int) -> int:
+    return min(max(page_size, 1), MAX_PAGE_SIZE)
+
+
+def encode_cursor(values) -> str:
+    raw = json.dumps(list(values), separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid page cursor")
+    if not isinstance(values, list):
+        raise HTTPException(status_code=400, detail="Invalid page cursor")
+    return values
+
+
+def _after(order_by, values):
+    # (a, b) after (x, y) means: a beyond x, or a = x and b beyond y; "beyond"
+    # follows each column's sort direction
+    clauses = []
+    for i, (column, descending) in enumerate(order_by):
+        beyond = column < values[i] if descending else column > values[i]
+        clauses.append(and_(*[c == v for (c, _), v in zip(order_by[:i], values)], beyond))
+    return or_(*clauses)
+
+
+def keyset_page(query: Query, order_by: list, key, cursor: str = None, page_size: int = DEFAULT_PAGE_SIZE) -> Page:
+    """
+    Fetches one page of `query` with keyset (seek) pagination.
+
+    Instead of OFFSET, each page starts strictly after the sort key of the last
+    row of the previous page, so every page costs an index range scan no matter
+    how deep it is, and rows inserted meanwhile never shift a page.
+
+    Args:
+        query (Query): The filtered, unordered query.
+        order_by (list): (column, descending) pairs; the last one must be unique.
+        key (callable): Returns the sort-key values of a result row, in order_by order.
+        cursor (str): The next_cursor of the previous page, or None for the first page.
+        page_size (int): Rows per page, capped at MAX_PAGE_SIZE.
+
+    Returns:
+        Page: The rows of the page and the cursor of the page after it.
+    """
+    page_size = clamp_page_size(page_size)
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(order_by):
+            raise HTTPException(status_code=400, detail="Invalid page cursor")
+        query = query.filter(_after(order_by, values))
+
+    rows = (
+        query.order_by(*[column.desc() if descending else column.asc() for column, descending in order_by])
+        .limit(page_size + 1)
+        .all()
+    )
+    next_cursor = encode_cursor(key(rows[page_size - 1])) if len(rows) > page_size else None
+    return Page(rows[:page_size], next_cursor)
+
+
+def estimate_count(db: Session, table_name: str):
+    """
+    Returns the planner's row estimate for a table from pg_class, which costs a
+    catalog lookup instead of a COUNT(*) scan. None if the table was never analyzed.
+    """
+    estimate = db.execute(
+        text("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(:table_name)"),
+        {"table_name": table_name},
+    ).scalar()
+    return estimate if estimate is not None and estimate >= 0 else None
@@ -0,0 +1,291 @@
+"""
+Maintains the monthly partitions of quiz_attempts.
+
+quiz_attempts is range-partitioned on attempted_at, one partition per calendar
+month (UTC) named quiz_attempts_pYYYY_MM. Partitions are created
+ATTEMPT_PARTITIONS_AHEAD months ahead, so inserts never find their month
+missing. With ATTEMPT_RETENTION_MONTHS set, partitions older than that are
+detached, written to ATTEMPT_ARCHIVE_DIR as gzip-compressed CSV (with a header
+row) and dropped. The app runs this at startup and then every
+PARTITION_MAINTENANCE_INTERVAL seconds; it can also be run from cron:
+
+    python -m app.partitions --retention-months 12
+
+An archived month can be restored by creating a table like quiz_attempts,
+loading the file with COPY ... FROM STDIN WITH (FORMAT csv, HEADER) and
+attaching it with ALTER TABLE quiz_attempts ATTACH PARTITION. Archives
+written before migration 960c5447ccd1 hold the answer texts (user_answer,
+correct_answer) instead of option indexes, and need converting first.
+"""
+import argparse
+import gzip
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from datetime import date, datetime, timezone
+from sqlalchemy import text
+from app.database import engine
+
+ATTEMPT_PARTITIONS_AHEAD = int(os.getenv("ATTEMPT_PARTITIONS_AHEAD", 3))
+ATTEMPT_RETENTION_MONTHS = int(os.getenv("ATTEMPT_RETENTION_MONTHS", 0))  # 0 = keep every month in the database
+ATTEMPT_ARCHIVE_DIR = os.getenv("ATTEMPT_ARCHIVE_DIR", "archive/quiz_attempts")
+PARTITION_MAINTENANCE_INTERVAL = float(os.getenv("PARTITION_MAINTENANCE_INTERVAL", 24 * 3600))
+
+PARENT_TABLE = "quiz_attempts"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+PARTITION_NAME = re.compile(rf"^{PARENT_TABLE}_p(\d{{4}})_(\d{{2}})$")
+# Serializes maintenance across workers; an arbitrary constant shared by every process
+MAINTENANCE_LOCK_ID = 0x71756174
+
+
+def month_start(day: date) -> date:
+    return date(day.year, day.month, 1)
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+def current_month() -> date:
+    return month_start(datetime.now(timezone.utc).date())
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_p{month.year:04d}_{month.month:02d}"
+
+def partition_month(name: str):
+    """Returns the month a partition name stands for, or None for other tables."""
+    match = PARTITION_NAME.match(name)
+    return date(int(match.group(1)), int(match.group(2)), 1) if match else None
+
+
+def partition_bounds(month: date) -> str:
+    return f"FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+
+
+def partition_ddl(month: date, parent: str = PARENT_TABLE) -> str:
+    """Returns the statement creating the partition that holds `month`."""
+    return f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {parent} FOR VALUES {partition_bounds(month)}"
+
+
+def default_partition_months(connection) -> list:
+    """Returns the months (UTC) that have rows in the DEFAULT partition, oldest first."""
+    rows = connection.execute(text(f"""
+        SELECT DISTINCT CAST(date_trunc('month', attempted_at AT TIME ZONE 'UTC') AS date)
+        FROM {DEFAULT_PARTITION}
+        ORDER BY 1
+    """))
+    return [month for month, in rows]
+
+
+def move_out_of_default(connection, month: date):
+    """
+    Creates the partition of `month` while the DEFAULT partition holds rows of
+    that month, which Postgres refuses to do with the default attached: the
+    default is detached, the rows are moved to the new partition and the
+    default is attached again.
+    """
+    connection.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+    connection.execute(text(partition_ddl(month)))
+    bounds = {"low": month, "high": add_months(month, 1)}
+    where = "attempted_at >= CAST(:low AS date) AT TIME ZONE 'UTC' AND attempted_at < CAST(:high AS date) AT TIME ZONE 'UTC'"
+    connection.execute(text(f"INSERT INTO {PARENT_TABLE} SELECT * FROM {DEFAULT_PARTITION} WHERE {where}"), bounds)
+    connection.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {where}"), bounds)
+    connection.execute(text(f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"))
+
+
+def list_partitions(connection, attached: bool = True) -> dict:
+    """
+    Returns the monthly partition tables, attached to quiz_attempts or, with
+    attached=False, left detached by an interrupted archive run.
+
+    Returns:
+        dict: Maps partition name to its month.
+    """
+    rows = connection.execute(text("""
+        SELECT c.relname, i.inhparent IS NOT NULL
+        FROM pg_class AS c
+        LEFT JOIN pg_inherits AS i ON i.inhrelid = c.oid AND i.inhparent = CAST(:parent AS regclass)
+        WHERE c.relkind = 'r' AND c.relname LIKE :prefix AND c.relnamespace = CAST(current_schema() AS regnamespace)
+    """), {"parent": PARENT_TABLE, "prefix": f"{PARENT_TABLE}_p%"})
+    return {
+        name: partition_month(name)
+        for name, is_attached in rows
+        if is_attached == attached and partition_month(name) is not None
+    }
+
+
+def ensure_partitions(connection, first_month: date = None, months_ahead: int = ATTEMPT_PARTITIONS_AHEAD) -> list:
+    """
+    Creates the missing partitions from `first_month` (default: the current
+    month) through `months_ahead` months past the current one, plus the
+    DEFAULT partition. Months that have rows in the DEFAULT partition get their
+    partition too, and the rows are moved into it. Existing partitions are left
+    alone, so the parent table is only locked when a new month is actually
+    added.
+
+    Returns:
+        list[str]: The names of the partitions created.
+    """
+    connection.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT_TABLE} DEFAULT"))
+    last_month = add_months(current_month(), months_ahead)
+    month = month_start(first_month) if first_month else current_month()
+    months = set()
+    while month <= last_month:
+        months.add(month)
+        month = add_months(month, 1)
+    stray_months = default_partition_months(connection)
+    if stray_months:
+        logging.warning(
+            f"{DEFAULT_PARTITION} holds attempts of {', '.join(month.strftime('%Y-%m') for month in stray_months)}; "
+            "partition maintenance fell behind, moving them to their monthly partitions"
+        )
+
+    existing = set(list_partitions(connection))
+    created = []
+    for month in sorted(months.union(stray_months)):
+        if partition_name(month) in existing:
+            continue
+        if month in stray_months:
+            move_out_of_default(connection, month)
+        else:
+            connection.execute(text(partition_ddl(month)))
+        created.append(partition_name(month))
+    return created
+
+
+def archive_partition(name: str, archive_dir: str = ATTEMPT_ARCHIVE_DIR) -> str:
+    """
+    Detaches one partition, writes its rows to `archive_dir`/<name>.csv.gz and
+    drops it. Each step commits on its own: the file is complete (written under
+    a temporary name, then renamed) before the table is dropped, and a
+    partition left detached by a crash is picked up again by the next run.
+
+    Returns:
+        str: The path of the archive file.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    path = os.path.join(archive_dir, f"{name}.csv.gz")
+    partial = f"{path}.partial"
+
+    with engine.connect() as connection:
+        if name in list_partitions(connection):
+            connection.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+            connection.commit()
+
+        cursor = connection.connection.cursor()
+        with open(partial, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb") as archive:
+                cursor.copy_expert(f"COPY {name} TO STDOUT WITH (FORMAT csv, HEADER)", archive)
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(partial, path)
+
+        connection.execute(text(f"DROP TABLE {name}"))
+        connection.commit()
+    return path
+
+
+def archive_partitions(retention_months: int = ATTEMPT_RETENTION_MONTHS, archive_dir: str = ATTEMPT_ARCHIVE_DIR) -> list:
+    """
+    Archives the partitions of every month before the last `retention_months`
+    full months; the current month is always kept. Does nothing if
+    retention_months is 0.
+
+    Returns:
+        list[str]: The paths of the archive files written.
+    """
+    if retention_months <= 0:
+        return []
+    cutoff = add_months(current_month(), -retention_months)
+    with engine.connect() as connection:
+        partitions = {**list_partitions(connection), **list_partitions(connection, attached=False)}
+    archived = []
+    for name, month in sorted(partitions.items(), key=lambda item: item[1]):
+        if month < cutoff:
+            archived.append(archive_partition(name, archive_dir))
+            logging.info(f"Archived partition {name} to {archived[-1]}")
+    return archived
+
+
+def maintain_partitions(retention_months: int = ATTEMPT_RETENTION_MONTHS, archive_dir: str = ATTEMPT_ARCHIVE_DIR,
+                        months_ahead: int = ATTEMPT_PARTITIONS_AHEAD) -> dict:
+    """
+    Creates upcoming partitions and archives expired ones. Only one process
+    runs it at a time; the others return right away.
+
+    Returns:
+        dict: The partitions created and the archive files written, or None if
+            another process holds the maintenance lock.
+    """
+    # A session-level lock, so it is held on this one connection across commits
+    with engine.connect() as connection:
+        if not connection.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": MAINTENANCE_LOCK_ID}).scalar():
+            connection.rollback()
+            return None
+        try:
+            created = ensure_partitions(connection, months_ahead=months_ahead)
+            connection.commit()
+            archived = archive_partitions(retention_months, archive_dir)
+        finally:
+            connection.rollback()
+            connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": MAINTENANCE_LOCK_ID})
+            connection.commit()
+    if created:
+        logging.info(f"Created partitions {', '.join(created)}")
+    return {"created": created, "archived": archived}
+
+
+class PartitionMaintenance:
+    """Runs maintain_partitions() on a background thread, at startup and then periodically."""
+
+    def __init__(self, interval: float = PARTITION_MAINTENANCE_INTERVAL):
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _run(self):
+        while True:
+            try:
+                maintain_partitions()
+            except Exception:
+                logging.exception("Partition maintenance failed.")
+            if self.interval <= 0 or self._stop.wait(self.interval):
+                return
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="partition-maintenance", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+
+partition_maintenance = PartitionMaintenance()
+
+
+def main():
+    logging.basicConfig(format="{asctime} | {levelname} | {message}", datefmt="%d-%b-%y %H:%M:%S", level=20, style="{")
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--months-ahead", type=int, default=ATTEMPT_PARTITIONS_AHEAD)
+    parser.add_argument("--retention-months", type=int, default=ATTEMPT_RETENTION_MONTHS,
+                        help="archive partitions older than this many months; 0 = never")
+    parser.add_argument("--archive-dir", default=ATTEMPT_ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    result = maintain_partitions(args.retention_months, args.archive_dir, args.months_ahead)
+    if result is None:
+        print("Partition maintenance is already running in another process.", file=sys.stderr)
+        return 1
+    print(json.dumps(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
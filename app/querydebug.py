@@ -0,0 +1,140 @@
+"""
+Development and test helpers that watch the SQL the app issues.
+
+With QUERY_DEBUG=true, every request's statements are fingerprinted (literals
+and bind parameters replaced by ?), and a warning is logged when the same
+statement shape runs N_PLUS_ONE_THRESHOLD times or more in one request, the
+usual sign of a per-row lazy load or lookup.
+
+In tests, wrap a request in assert_query_budget() to pin how many statements
+a route may issue:
+
+    with assert_query_budget(4) as recorder:
+        client.get("/home")
+    assert not recorder.repeated()
+"""
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+
+QUERY_DEBUG = os.getenv("QUERY_DEBUG", "false").lower() in ("1", "true", "yes")
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 3))
+
+_FINGERPRINT_RULES = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),                  # string literals
+    (re.compile(r"%\(\w+\)s|%s|\$\d+|(?<!:):\w+"), "?"),    # bind parameters of any paramstyle
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),                # numeric literals
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(?...)"),  # IN lists of any length
+    (re.compile(r"\s+"), " "),
+]
+
+# Statement shapes of the current request, set by QueryDebugMiddleware
+_request_statements: ContextVar = ContextVar("request_statements", default=None)
+_recorders = []  # active QueryRecorders
+_recorders_lock = threading.Lock()
+
+
+def fingerprint(statement: str) -> str:
+    """Reduces a SQL statement to its shape, so executions that differ only in values compare equal."""
+    for pattern, replacement in _FINGERPRINT_RULES:
+        statement = pattern.sub(replacement, statement)
+    return statement.strip()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    statements = _request_statements.get()
+    if statements is not None:
+        statements[fingerprint(statement)] += 1
+    if _recorders:
+        with _recorders_lock:
+            for recorder in _recorders:
+                recorder.statements.append(statement)
+
+def install_query_hooks(*engines):
+    """Hooks the given sync Engines; safe to call more than once."""
+    for engine in engines:
+        if not event.contains(engine, "after_cursor_execute", _after_cursor_execute):
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _default_engines():
+    from app.database import async_engine, engine
+    return engine, async_engine.sync_engine
+
+
+class QueryRecorder:
+    """Records every statement run on the hooked engines while it is active, from any thread."""
+
+    def __init__(self, engines=None):
+        self.engines = engines or _default_engines()
+        self.statements = []
+
+    def __enter__(self):
+        install_query_hooks(*self.engines)
+        with _recorders_lock:
+            _recorders.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        with _recorders_lock:
+            _recorders.remove(self)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def fingerprints(self) -> Counter:
+        return Counter(fingerprint(statement) for statement in self.statements)
+
+    def repeated(self, threshold: int = 2) -> dict:
+        """Returns the statement shapes that ran at least `threshold` times, with their counts."""
+        return {shape: count for shape, count in self.fingerprints().items() if count >= threshold}
+
+
+@contextmanager
+def assert_query_budget(max_statements: int, engines=None):
+    """
+    Fails with an AssertionError if the block issues more than `max_statements`
+    statements; the message lists them by shape.
+    """
+    with QueryRecorder(engines) as recorder:
+        yield recorder
+    if recorder.count > max_statements:
+        shapes = "\n".join(f"  {count}x {shape}" for shape, count in recorder.fingerprints().most_common())
+        raise AssertionError(f"Expected at most {max_statements} statements, got {recorder.count}:\n{shapes}")
+
+
+class QueryDebugMiddleware:
+    """
+    Plain ASGI middleware that fingerprints the statements of each request and
+    logs a warning for statement shapes repeated N_PLUS_ONE_THRESHOLD times or
+    more. Meant for development; it adds a regex pass per statement.
+    """
+
+    def __init__(self, app, threshold: int = N_PLUS_ONE_THRESHOLD):
+        self.app = app
+        self.threshold = threshold
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        statements = Counter()
+        token = _request_statements.set(statements)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _request_statements.reset(token)
+            route = getattr(scope.get("route"), "path", scope["path"])
+            for shape, count in statements.items():
+                if count >= self.threshold:
+                    logging.warning(
+                        f"Possible N+1 on {scope['method']} {route}: {count}x {shape} "
+                        f"({sum(statements.values())} statements in total)"
+                    )
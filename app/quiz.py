@@ -0,0 +1,112 @@
+from datetime import datetime, timezone
+from typing import NamedTuple
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.answerkey import answer_key
+from app.attempts import attempt_writer
+from app.crud import submit_quiz_session, add_quiz_attempts, upsert_quiz_stats
+from app.leaderboard import leaderboard
+from app.models import User
+from app.review import GradedItem, review_cache
+
+OPTION_LETTERS = ("a", "b", "c", "d")
+
+
+class GradedAnswer(NamedTuple):
+    question_id: int
+    answer: str   # option letter the user picked, or None if left blank
+    correct: str  # option letter of the correct answer
+    is_correct: bool
+
+
+def question_options(question) -> tuple:
+    """Returns the answer options of a question, in letter order."""
+    return (question.option_a, question.option_b, question.option_c, question.option_d)
+
+def option_letter(index: int):
+    """Returns the letter of the option at `index`, or None for no (or an unknown) option."""
+    return OPTION_LETTERS[index] if index is not None and 0 <= index < len(OPTION_LETTERS) else None
+
+
+async def grade_submission(db: AsyncSession, user, session_id: int, answers: dict):
+    """
+    Grades a quiz submission and records it: closes the quiz session, adds to
+    the user's stats and score and moves the user on the leaderboard, in one
+    transaction that is committed before returning.
+
+    The answers are graded from the in-memory answer key, without reading the
+    questions. The attempt rows are written in that same transaction, unless
+    write-behind is enabled, in which case they are handed to the attempt
+    writer after the commit (or written right away if its queue is full).
+    Either way the graded answers are cached for the review, so it shows
+    before deferred rows are flushed.
+
+    Args:
+        db (AsyncSession): The database session.
+        user (SessionUser): The user submitting the quiz.
+        session_id (int): The quiz session the questions were handed out under.
+        answers (dict): Maps question ID to the picked option letter (a-d).
+
+    Returns:
+        list[GradedAnswer]: The graded answers, or None if the session is unknown,
+            belongs to another user or was already submitted, in which case
+            nothing is written.
+    """
+    key = await answer_key.lookup(db, list(answers))
+    # Stamped here rather than by the database, so deferred rows keep the submission
+    # time; the session's submitted_at is set to the same value
+    attempted_at = datetime.now(timezone.utc)
+    graded = []
+    attempts = []
+    review = []
+    tallies = {}  # (category, difficulty) -> [solved, correct]
+
+    for question_id, entry in key.items():
+        letter = answers[question_id]
+        user_option = OPTION_LETTERS.index(letter) if letter in OPTION_LETTERS else None
+        is_correct = user_option is not None and user_option == entry.correct
+
+        graded.append(GradedAnswer(question_id, option_letter(user_option), option_letter(entry.correct), is_correct))
+        attempts.append({
+            "user_id": user.id,
+            "question_id": question_id,
+            "user_option": user_option,
+            "correct_option": entry.correct,
+            "is_correct": is_correct,
+            "session_id": session_id,
+            "attempted_at": attempted_at,
+        })
+        review.append(GradedItem(question_id, user_option, entry.correct, is_correct))
+        tally = tallies.setdefault((entry.category, entry.difficulty), [0, 0])
+        tally[0] += 1
+        if is_correct:
+            tally[1] += 1
+
+    score = sum(answer.is_correct for answer in graded)
+
+    # Close the session first; a session that is unknown, someone else's or
+    # already submitted rejects the whole submission
+    if not await submit_quiz_session(db, user.id, session_id, score, attempted_at):
+        await db.rollback()
+        return None
+
+    # One INSERT for the attempts, one upsert for the stats and one UPDATE for the score.
+    # Read once: if the writer stops before offer(), the rows are written below
+    deferred = attempt_writer.running
+    if not deferred:
+        await add_quiz_attempts(db, attempts)
+    await upsert_quiz_stats(db, user.id, tallies)
+    result = await db.execute(
+        update(User).where(User.id == user.id).values(score=User.score + score).returning(User.score)
+    )
+    new_score = result.scalar_one()
+    await db.commit()
+    leaderboard.set_score(user.id, user.username, new_score)
+
+    # Only the attempt log may be deferred; a full queue or a stopped writer
+    # falls back to a synchronous write
+    if deferred and not attempt_writer.offer(attempts):
+        await add_quiz_attempts(db, attempts)
+        await db.commit()
+    review_cache.put(user.id, session_id, review)
+    return graded
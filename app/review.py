@@ -0,0 +1,181 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models import Question, QuizAttempt, QuizSession
+
+# How many reviewed quiz sessions each worker keeps in memory
+REVIEW_CACHE_SIZE = int(os.getenv("REVIEW_CACHE_SIZE", 1024))
+
+
+def option_text(options: tuple, index: int):
+    """Returns the text of the option at `index`, or None for no (or an unknown) option."""
+    return options[index] if index is not None and 0 <= index < len(options) else None
+
+
+class ReviewItem(NamedTuple):
+    question_id: int
+    question_text: str
+    options: tuple  # the answer options, in letter order
+    user_option: int  # index of the picked option, or None
+    correct_option: int
+    is_correct: bool
+
+    @property
+    def user_answer(self):
+        return option_text(self.options, self.user_option)
+
+    @property
+    def correct_answer(self):
+        return option_text(self.options, self.correct_option)
+
+
+class GradedItem(NamedTuple):
+    """An answer as graded from the answer key, before its question's texts are looked up."""
+    question_id: int
+    user_option: int  # index of the picked option, or None
+    correct_option: int
+    is_correct: bool
+
+
+async def load_review(db: AsyncSession, user_id: int, session_id: int) -> list:
+    """
+    Loads the attempts of one quiz session together with their question text and
+    options in a single joined query, selecting only the columns a review shows.
+    Attempts store option indexes; the answer texts are the question's options.
+
+    The attempts of a session all carry its submission time as attempted_at
+    (sessions migrated from before quiz_sessions had none: their start time),
+    so the query is bounded to that one value and Postgres reads only the
+    partition of its month. The bound is a subquery, evaluated before the
+    partitions are scanned, which keeps the review to one statement.
+
+    Returns:
+        list[ReviewItem]: The attempts of the session, in answer order.
+    """
+    attempted_at = (
+        select(func.coalesce(QuizSession.submitted_at, QuizSession.started_at))
+        .where(QuizSession.id == session_id)
+        .scalar_subquery()
+    )
+    result = await db.execute(
+        select(
+            Question.id,
+            Question.question_text,
+            Question.option_a,
+            Question.option_b,
+            Question.option_c,
+            Question.option_d,
+            QuizAttempt.user_option,
+            QuizAttempt.correct_option,
+            QuizAttempt.is_correct,
+        )
+        .join(Question, Question.id == QuizAttempt.question_id)
+        .where(
+            QuizAttempt.user_id == user_id,
+            QuizAttempt.session_id == session_id,
+            QuizAttempt.attempted_at == attempted_at,
+        )
+        .order_by(QuizAttempt.id)
+    )
+    return [
+        ReviewItem(question_id, text, (a, b, c, d), user_option, correct_option, is_correct)
+        for question_id, text, a, b, c, d, user_option, correct_option, is_correct in result
+    ]
+
+
+async def resolve_review(db: AsyncSession, graded: list) -> list:
+    """
+    Looks up the question text and options of graded answers by primary key,
+    with one query.
+
+    Returns:
+        list[ReviewItem]: The answers of the graded list whose question still exists.
+    """
+    result = await db.execute(
+        select(
+            Question.id, Question.question_text,
+            Question.option_a, Question.option_b, Question.option_c, Question.option_d,
+        ).where(Question.id.in_([item.question_id for item in graded]))
+    )
+    questions = {row.id: row for row in result}
+    review = []
+    for item in graded:
+        q = questions.get(item.question_id)
+        if q is None:
+            continue
+        options = (q.option_a, q.option_b, q.option_c, q.option_d)
+        review.append(ReviewItem(q.id, q.question_text, options, item.user_option, item.correct_option, item.is_correct))
+    return review
+
+
+async def get_review(db: AsyncSession, user_id: int, session_id: int) -> list:
+    """
+    Returns the review of a quiz session, from the cache when possible.
+
+    Returns:
+        list[ReviewItem]: The attempts of the session, or an empty list if the
+            user has none in it.
+    """
+    review = review_cache.get(user_id, session_id)
+    if review and isinstance(review[0], GradedItem):
+        # Cached at submission, before the texts were needed
+        review = await resolve_review(db, review)
+        review_cache.put(user_id, session_id, review)
+    elif review is None:
+        review = await load_review(db, user_id, session_id)
+        review_cache.put(user_id, session_id, review)
+    return review
+
+
+class ReviewCache:
+    """
+    Keeps the reviews of recently finished quiz sessions, keyed by (user ID,
+    session ID). A submitted session never changes, so repeat views are served
+    from memory; the least recently viewed sessions are evicted first.
+
+    A submission caches its graded answers (GradedItems) right away, so its
+    review shows even while its attempt rows wait for the write-behind flusher;
+    get_review() swaps them for ReviewItems on the first view.
+
+    Admin routes that edit or delete questions or users clear the affected
+    entries, since those are the only writes that change a finished review.
+    """
+
+    def __init__(self, max_size: int = REVIEW_CACHE_SIZE):
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._reviews = OrderedDict()  # (user_id, session_id) -> list[ReviewItem] or list[GradedItem]
+
+    def get(self, user_id: int, session_id: int):
+        """Returns the cached review, or None if the session is not cached."""
+        with self._lock:
+            review = self._reviews.get((user_id, session_id))
+            if review is not None:
+                self._reviews.move_to_end((user_id, session_id))
+            return review
+
+    def put(self, user_id: int, session_id: int, review: list):
+        # Empty reviews are not cached, so unknown session IDs cannot fill the cache
+        if not review or self.max_size <= 0:
+            return
+        with self._lock:
+            self._reviews[(user_id, session_id)] = review
+            self._reviews.move_to_end((user_id, session_id))
+            while len(self._reviews) > self.max_size:
+                self._reviews.popitem(last=False)
+
+    def discard_user(self, user_id: int):
+        """Drops every cached review of a user."""
+        with self._lock:
+            for key in [key for key in self._reviews if key[0] == user_id]:
+                del self._reviews[key]
+
+    def clear(self):
+        with self._lock:
+            self._reviews.clear()
+
+
+review_cache = ReviewCache()
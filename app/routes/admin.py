@@ -3,24 +3,22 @@ from fastapi import APIRouter, Depends, HTTPException, Request, Form
 from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, pool_stats
 from app.models import User, Question, QuizAttempt
-
-# Configure logging
-logging.basicConfig(
-    # filename="admin_quiz.log",
-    # filemode="a",
-    format="{asctime} | {levelname} | {message}",
-    datefmt="%d-%b-%y %H:%M:%S",
-    level=20,
-    style="{"
-)
+from app.answerkey import NO_OPTION, answer_key
+from app.catalog import bump_catalog_version, question_catalog
+from app.leaderboard import leaderboard
+from app.sampler import question_sampler
+from app.review import review_cache
+from app.pagination import DEFAULT_PAGE_SIZE, Page, estimate_count, keyset_page
+from app.search import search_questions
+from app.utils import is_admin_session, SESSION_COOKIE
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
 @router.get("/admin")
-def admin_page(request: Request, db: Session = Depends(get_db)):
+def admin_page(request: Request, db: Session = Depends(get_db), cursor: str = None, page_size: int = DEFAULT_PAGE_SIZE):
     """
     Handles GET requests to the /admin route, rendering the admin home page
     if the user is authenticated as an admin.
@@ -28,28 +26,36 @@ def admin_page(request: Request, db: Session = Depends(get_db)):
     Args:
         request (Request): The HTTP request object containing metadata about the request.
         db (Session): The database session used for querying user data.
+        cursor (str): The cursor of the page of users to show; the first page if omitted.
+        page_size (int): The number of users per page (capped).
 
     Returns:
         RedirectResponse: Redirects to the login page if the user is not authenticated as an admin.
-        TemplateResponse: Renders the admin.html template with the request object and a list of users.
+        TemplateResponse: Renders the admin.html template with the request object and a page of users.
 
     Logs:
         Info: When the admin accesses the home page.
     """
 
-    is_admin = request.cookies.get("is_admin")
-    
-    if is_admin != "true":
+    if not is_admin_session(request):
         return RedirectResponse(url="/login", status_code=303)
 
-    # questions = db.query(Question).all()  # Fetch all questions
-    users = db.query(User).all()  # Fetch all users
+    # Fetch one page of users, ordered by ID
+    page = keyset_page(
+        db.query(User),
+        order_by=[(User.id, False)],
+        key=lambda user: (user.id,),
+        cursor=cursor,
+        page_size=page_size,
+    )
 
     logging.info("Admin accessed the Home page.")
     return templates.TemplateResponse("admin.html", {
         "request": request,
-        # "questions": questions,
-        "users": users,
+        "users": page.rows,
+        "next_cursor": page.next_cursor,
+        "is_first_page": not cursor,
+        "total_estimate": estimate_count(db, "users"),
     })
 
 @router.post("/admin-logout")
@@ -66,11 +72,32 @@ def logout():
     """
 
     response = RedirectResponse(url="/login", status_code=303)
-    response.delete_cookie("is_admin")  # Clear session cookie
+    response.delete_cookie(SESSION_COOKIE)  # Clear session cookie
     logging.info("Admin logged out.")
     return response
 
 
+# Connection Pool Stats
+@router.get("/admin/pool-stats")
+def admin_pool_stats(request: Request):
+    """
+    Handles GET requests to the admin pool stats endpoint, reporting the state of
+    the database connection pools of this worker.
+
+    Args:
+        request (Request): The HTTP request object containing metadata about the request.
+
+    Returns:
+        dict: Checked-out and idle connections, overflow in use, checkouts, timeouts and
+            time spent waiting for a connection, for the sync and async pools.
+        RedirectResponse: Redirects to the login page if the admin session cookie is invalid.
+    """
+
+    if not is_admin_session(request):
+        return RedirectResponse(url="/login", status_code=303)
+    return pool_stats()
+
+
 # Edit User Page 
 @router.get("/admin/edit/{user_id}")
 def edit_user_page(user_id: int, request: Request, db: Session = Depends(get_db)):
@@ -92,9 +119,7 @@ def edit_user_page(user_id: int, request: Request, db: Session = Depends(get_db)
     Logs:
         Info: When an admin accesses the edit page for a user.
     """
-    is_admin = request.cookies.get("is_admin")
-
-    if is_admin != "true":
+    if not is_admin_session(request):
         return RedirectResponse(url="/login", status_code=303)
 
     user = db.query(User).filter(User.id == user_id).first()
@@ -126,9 +151,7 @@ def update_user(request: Request, user_id: int, score: int = Form(...), db: Sess
         Info: When an admin updates a user's score.
     """
 
-    is_admin = request.cookies.get("is_admin")
-
-    if is_admin != "true":
+    if not is_admin_session(request):
         return RedirectResponse(url="/login", status_code=303)
     
     user = db.query(User).filter(User.id == user_id).first()
@@ -137,6 +160,7 @@ def update_user(request: Request, user_id: int, score: int = Form(...), db: Sess
 
     user.score = score
     db.commit()
+    leaderboard.set_score(user.id, user.username, score)
     logging.info(f"Admin updated user {user_id}'s score to {score}.")
     return RedirectResponse(url="/admin", status_code=303)
 
@@ -161,9 +185,7 @@ def delete_user(request: Request, user_id: int, db: Session = Depends(get_db)):
         Info: When an admin deletes a user.
     """
 
-    is_admin = request.cookies.get("is_admin")
-
-    if is_admin != "true":
+    if not is_admin_session(request):
         return RedirectResponse(url="/login", status_code=303)
 
     user = db.query(User).filter(User.id == user_id).first()
@@ -172,24 +194,28 @@ def delete_user(request: Request, user_id: int, db: Session = Depends(get_db)):
 
     db.delete(user)
     db.commit()
+    leaderboard.remove(user_id)
+    review_cache.discard_user(user_id)
     logging.info(f"Admin deleted user {user_id}.")
     return RedirectResponse(url="/admin", status_code=303)
 
 
 # Question List Page
 @router.get("/admin/questions")
-def admin_questions(request: Request, db: Session = Depends(get_db), search: str = ""):
+def admin_questions(request: Request, db: Session = Depends(get_db), search: str = "", cursor: str = None, page_size: int = DEFAULT_PAGE_SIZE):
     """
-    Handles GET requests to the admin questions endpoint, displaying a list of questions
+    Handles GET requests to the admin questions endpoint, displaying a page of questions
     that match the search query.
 
     Args:
         request (Request): The HTTP request object containing metadata about the request.
         db (Session): The database session used for querying and verifying question data.
         search (str): The search query to filter questions by.
+        cursor (str): The cursor of the page to show; the first page if omitted.
+        page_size (int): The number of questions per page (capped).
 
     Returns:
-        TemplateResponse: Renders the admin_questions.html template with the list of questions
+        TemplateResponse: Renders the admin_questions.html template with the page of questions
             and the search query as context.
 
     Raises:
@@ -198,26 +224,38 @@ def admin_questions(request: Request, db: Session = Depends(get_db), search: str
     Logs:
         Info: When an admin accesses the question list.
     """
-    query = db.query(Question)
+    if not is_admin_session(request):
+        return RedirectResponse(url="/login", status_code=303)
 
-    if search:
+    total_estimate = None
+
+    if search.isdigit():
         # filtering by ID if the search is numeric
-        if search.isdigit():
-            query = query.filter(Question.id == int(search))
-        else:
-            # search by category or difficulty or question text
-            query = query.filter(
-                (Question.category.ilike(f"%{search}%")) | 
-                (Question.difficulty.ilike(f"%{search}%")) |
-                (Question.question_text.ilike(f"%{search}%"))
-            )
-
-    questions = query.all()
+        page = Page(db.query(Question).filter(Question.id == int(search)).all(), None)
+    elif search:
+        # ranked full-text / substring search by category, difficulty or question text
+        page = search_questions(db, search, cursor=cursor, page_size=page_size)
+    else:
+        page = keyset_page(
+            db.query(Question),
+            order_by=[(Question.id, False)],
+            key=lambda question: (question.id,),
+            cursor=cursor,
+            page_size=page_size,
+        )
+        total_estimate = estimate_count(db, "questions")
 
     logging.info("Admin accessed the question list.")
     return templates.TemplateResponse(
         "admin_questions.html",
-        {"request": request, "questions": questions, "search_query": search}
+        {
+            "request": request,
+            "questions": page.rows,
+            "search_query": search,
+            "next_cursor": page.next_cursor,
+            "is_first_page": not cursor,
+            "total_estimate": total_estimate,
+        }
     )
 
 
@@ -233,11 +271,15 @@ def create_question_page(request: Request):
 
     Returns:
         TemplateResponse: Renders the create_question.html template with the request object.
+        RedirectResponse: Redirects to the login page if the admin session cookie is invalid.
 
     Logs:
         Info: When the admin accesses the create question page.
     """
 
+    if not is_admin_session(request):
+        return RedirectResponse(url="/login", status_code=303)
+
     logging.info("Admin accessed create question page.")
     return templates.TemplateResponse("create_question.html", {"request": request})
 
@@ -274,9 +316,7 @@ def create_question(
     Logs:
         Info: When the admin creates a new question.
     """
-    is_admin = request.cookies.get("is_admin")
-
-    if is_admin != "true":
+    if not is_admin_session(request):
         return RedirectResponse(url="/login", status_code=303)
     
     options_map = {
@@ -286,6 +326,7 @@ def create_question(
         "D": option_d
     }
     correct_answer_value = options_map.get(correct_option, "")
+    correct_letter_index = list(options_map).index(correct_option) if correct_option in options_map else NO_OPTION
     
     new_question = Question(
         question_text=question_text,
@@ -300,7 +341,13 @@ def create_question(
     )
 
     db.add(new_question)
+    version = bump_catalog_version(db)
     db.commit()
+    question_catalog.invalidate()
+    question_sampler.add(new_question.id, category, difficulty)
+    question_sampler.advance(version)
+    answer_key.put(new_question.id, correct_letter_index, category, difficulty)
+    answer_key.advance(version)
     logging.info("Admin created a new question.")
     return RedirectResponse(url="/admin/questions", status_code=303)
 
@@ -320,11 +367,15 @@ def edit_question(request: Request, id: int, db: Session = Depends(get_db)):
     Returns:
         TemplateResponse: Renders the edit_question.html template with the question data.
         dict: Returns a dictionary with an "error" key if the question is not found.
+        RedirectResponse: Redirects to the login page if the admin session cookie is invalid.
 
     Logs:
         Warning: When a question with the given ID is not found.
         Info: When the edit_question.html template is rendered.
     """
+    if not is_admin_session(request):
+        return RedirectResponse(url="/login", status_code=303)
+
     question = db.query(Question).filter(Question.id == id).first()
     if not question:
         logging.warning(f"Question with ID {id} not found.")
@@ -336,6 +387,7 @@ def edit_question(request: Request, id: int, db: Session = Depends(get_db)):
 # edit Question(POST)
 @router.post("/admin/edit-question/{id}")
 def update_question(
+    request: Request,
     id: int,
     question_text: str = Form(...),
     option_a: str = Form(...),
@@ -352,6 +404,7 @@ def update_question(
     existing question in the database with the given ID.
 
     Args:
+        request (Request): The HTTP request object containing metadata about the request.
         id (int): The ID of the question to update.
         question_text (str): The new text for the question.
         option_a, option_b, option_c, option_d (str): The new options for the question.
@@ -361,12 +414,16 @@ def update_question(
         db (Session): The database session used for querying and updating questions.
 
     Returns:
-        RedirectResponse: Redirects to the /admin/questions page after updating the question.
+        RedirectResponse: Redirects to the /admin/questions page after updating the question,
+            or to the login page if the admin session cookie is invalid.
 
     Logs:
         Warning: When a question with the given ID is not found.
         Info: When the question is updated and redirected to /admin/questions.
     """
+    if not is_admin_session(request):
+        return RedirectResponse(url="/login", status_code=303)
+
     db_question = db.query(Question).filter(Question.id == id).first()
     if not db_question:
         logging.warning(f"Question with ID {id} not found for update.")
@@ -379,6 +436,7 @@ def update_question(
         "D": option_d
     }
     correct_answer_value = options_map.get(correct_option, "")
+    correct_letter_index = list(options_map).index(correct_option) if correct_option in options_map else NO_OPTION
 
     db_question.question_text = question_text
     db_question.option_a = option_a
@@ -389,22 +447,31 @@ def update_question(
     db_question.category = category
     db_question.difficulty = difficulty
 
+    version = bump_catalog_version(db)
     db.commit()
+    question_catalog.invalidate()
+    question_sampler.move(id, category, difficulty)
+    question_sampler.advance(version)
+    answer_key.put(id, correct_letter_index, category, difficulty)
+    answer_key.advance(version)
+    review_cache.clear()
     logging.info(f"Updated Question ID {id} and redirecting to /admin/questions")
     return RedirectResponse(url="/admin/questions", status_code=303)
 
 # Delete Question
 @router.post("/admin/delete-question/{id}")
-def delete_question(id: int, db: Session = Depends(get_db)):
+def delete_question(request: Request, id: int, db: Session = Depends(get_db)):
     """
     Handles POST requests to delete a question by ID from the database.
 
     Args:
+        request (Request): The HTTP request object containing metadata about the request.
         id (int): The ID of the question to delete.
         db (Session): The database session used for querying and deleting question data.
 
     Returns:
-        RedirectResponse: Redirects to the /admin/questions page after deletion.
+        RedirectResponse: Redirects to the /admin/questions page after deletion, or to the
+            login page if the admin session cookie is invalid.
         dict: Returns a dictionary with an "error" key if the question is not found.
 
     Logs:
@@ -412,6 +479,9 @@ def delete_question(id: int, db: Session = Depends(get_db)):
         Info: When a question is successfully deleted and redirected to /admin/questions.
     """
 
+    if not is_admin_session(request):
+        return RedirectResponse(url="/login", status_code=303)
+
     question = db.query(Question).filter(Question.id == id).first()
     if not question:
         logging.warning(f"Question with ID {id} not found for deletion.")
@@ -421,6 +491,13 @@ def delete_question(id: int, db: Session = Depends(get_db)):
     db.query(QuizAttempt).filter(QuizAttempt.question_id == id).delete()
 
     db.delete(question)
+    version = bump_catalog_version(db)
     db.commit()
+    question_catalog.invalidate()
+    question_sampler.discard(id)
+    question_sampler.advance(version)
+    answer_key.discard(id)
+    answer_key.advance(version)
+    review_cache.clear()
     logging.info(f"Deleted Question ID {id} and redirecting to /admin/questions")
     return RedirectResponse(url="/admin/questions", status_code=303)
\ No newline at end of file
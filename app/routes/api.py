@@ -0,0 +1,197 @@
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.answerkey import answer_key
+from app.catalog import question_catalog
+from app.crud import create_quiz_session, get_user_login, get_user_stats, user_exists
+from app.database import get_db, get_async_db
+from app.leaderboard import leaderboard
+from app.quiz import grade_submission, option_letter, question_options
+from app.review import get_review
+from app.sampler import question_sampler
+from app.schemas import (
+    LeaderboardOut, QuizOut, QuizResultOut, QuizSubmission, ReviewOut, StatsOut, TokenResponse,
+    UserLogin,
+)
+from app.utils import SESSION_TTL, create_session_token, get_session_user, verify_password
+
+# Versioned JSON API for mobile clients. Responses are serialized with orjson;
+# the session token is accepted as a Bearer header or as the session cookie.
+router = APIRouter(prefix="/api/v1", tags=["api"], default_response_class=ORJSONResponse)
+
+
+def not_authenticated() -> HTTPException:
+    return HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+
+
+def require_user(request: Request):
+    """
+    Dependency returning the SessionUser of the request, or raising a 401. The
+    token is not checked against the database: routes that write for the user
+    turn a deleted user into a 401 themselves.
+    """
+    user = get_session_user(request)
+    if not user:
+        raise not_authenticated()
+    return user
+
+
+@router.post("/login", response_model=TokenResponse)
+def api_login(credentials: UserLogin, db: Session = Depends(get_db)):
+    """
+    Exchanges a user's credentials for a session token.
+
+    Returns:
+        TokenResponse: The token, to send as "Authorization: Bearer <token>".
+
+    Raises:
+        HTTPException: 401 if the credentials are invalid.
+    """
+    user = get_user_login(db, credentials.username)
+    if not user or not verify_password(credentials.password, user.hashed_password):
+        logging.warning(f"Failed API login attempt for username: {credentials.username}")
+        raise HTTPException(status_code=401, detail="Invalid credentials")
+    logging.info(f"User API login successful: {user.username}")
+    return {
+        "token": create_session_token(user.id, user.username, "user"),
+        "expires_in": int(SESSION_TTL.total_seconds()),
+    }
+
+
+@router.get("/quiz", response_model=QuizOut)
+def api_quiz(category: str = None, difficulty: str = None, user=Depends(require_user), db: Session = Depends(get_db)):
+    """
+    Draws 5 random questions matching the optional filters and opens the quiz
+    session they are to be submitted under.
+
+    Returns:
+        QuizOut: The session ID and the questions with their options in letter order.
+
+    Raises:
+        HTTPException: 401 if the user was deleted.
+    """
+    # The bank is filled by the background ingestion pipeline; resync the sampler and answer key if it changed
+    version = question_catalog.get(db).version
+    question_sampler.sync(version)
+    answer_key.sync(version)
+    question_ids = question_sampler.sample_ids(db, category=category, difficulty=difficulty, k=5)
+    try:
+        session_id = create_quiz_session(db, user.id, category, difficulty) if question_ids else None
+    except IntegrityError:
+        # The only foreign key of the session is its user, deleted since the token was issued
+        db.rollback()
+        raise not_authenticated()
+    questions = question_sampler.load(db, question_ids)
+
+    logging.info(f"User {user.username} fetched quiz session {session_id} over the API")
+    return {
+        "session_id": session_id,
+        "questions": [
+            {
+                "id": q.id,
+                "text": q.question_text,
+                "category": q.category,
+                "difficulty": q.difficulty,
+                "options": question_options(q),
+            }
+            for q in questions
+        ],
+    }
+
+
+@router.post("/quiz/{session_id}/submit", response_model=QuizResultOut)
+async def api_submit(session_id: int, submission: QuizSubmission, user=Depends(require_user),
+                     db: AsyncSession = Depends(get_async_db)):
+    """
+    Grades and records the answers of a quiz session.
+
+    Returns:
+        QuizResultOut: The score and, per question, the picked and correct option letters.
+
+    Raises:
+        HTTPException: 409 if the session is unknown, someone else's or already
+            submitted; 401 if the user was deleted.
+    """
+    graded = await grade_submission(db, user, session_id, submission.answers)
+    if graded is None:
+        if not await user_exists(db, user.id):
+            raise not_authenticated()
+        logging.warning(f"User {user.username} submitted quiz session {session_id}, which is not open")
+        raise HTTPException(status_code=409, detail="Quiz session is not open")
+
+    score = sum(answer.is_correct for answer in graded)
+    logging.info(f"User {user.username} submitted a quiz over the API - Score: {score}/{len(graded)}")
+    return {
+        "session_id": session_id,
+        "score": score,
+        "total": len(graded),
+        "answers": [answer._asdict() for answer in graded],
+    }
+
+
+@router.get("/quiz/{session_id}/review", response_model=ReviewOut)
+async def api_review(session_id: int, user=Depends(require_user), db: AsyncSession = Depends(get_async_db)):
+    """
+    Returns a submitted quiz session with the picked and correct option letters.
+
+    Raises:
+        HTTPException: 404 if the user has no attempts in that session.
+    """
+    review = await get_review(db, user.id, session_id)
+    if not review:
+        raise HTTPException(status_code=404, detail="Quiz session not found")
+
+    return {
+        "session_id": session_id,
+        "items": [
+            {
+                "question_id": item.question_id,
+                "text": item.question_text,
+                "options": item.options,
+                "answer": option_letter(item.user_option),
+                "correct": option_letter(item.correct_option),
+                "is_correct": item.is_correct,
+            }
+            for item in review
+        ],
+    }
+
+
+@router.get("/stats", response_model=StatsOut)
+def api_stats(user=Depends(require_user), db: Session = Depends(get_db)):
+    """Returns the user's score, rank and per-(category, difficulty) stats with per-category totals."""
+    stats, category_totals = get_user_stats(db, user.id)
+    entry = leaderboard.get(user.id)
+
+    def stat(row):
+        return {
+            "category": row.category,
+            "difficulty": row.difficulty,
+            "solved": row.solved_count,
+            "correct": row.correct_count,
+        }
+
+    return {
+        "score": entry.score if entry else 0,
+        "rank": leaderboard.rank(user.id),
+        "total_players": len(leaderboard),
+        "stats": [stat(row) for row in stats],
+        "category_totals": [stat(row) for row in category_totals],
+    }
+
+
+@router.get("/leaderboard", response_model=LeaderboardOut)
+def api_leaderboard(offset: int = Query(0, ge=0), limit: int = Query(10, ge=1, le=100), user=Depends(require_user)):
+    """Returns one page of the leaderboard, with tied scores sharing a rank."""
+    entries = leaderboard.page(offset, limit)
+    ranked = []
+    for position, entry in enumerate(entries, start=offset + 1):
+        if not ranked:
+            rank = leaderboard.rank(entry.user_id) or position
+        elif entry.score != ranked[-1]["score"]:
+            rank = position
+        ranked.append({"rank": rank, "username": entry.username, "score": entry.score})
+    return {"total_players": len(leaderboard), "entries": ranked}
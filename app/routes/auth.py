@@ -1,25 +1,20 @@
 import logging
-from datetime import datetime
 from fastapi import APIRouter, Depends, Request, Form
 from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy.sql.expression import func
-from app.database import get_db
-from app.crud import create_user, get_user_by_username, get_user_login
-from app.utils import verify_password, store_questions_in_db, get_current_user
+from app.database import get_db, get_async_db
+from app.crud import create_user, get_user_by_username, get_user_login, get_user_stats, create_quiz_session, user_exists
+from app.utils import verify_password, get_current_user, get_session_user, set_session_cookie, SESSION_COOKIE
 from app.schemas import UserCreate
-from app.models import User, Question, QuizAttempt, Admin, UserQuizStats
-
-# Configure logging
-logging.basicConfig(
-    # filename="user_quiz.log",
-    # filemode="a",
-    format="{asctime} | {levelname} | {message}",
-    datefmt="%d-%b-%y %H:%M:%S",
-    level=20,
-    style="{"
-)
+from app.models import Admin
+from app.answerkey import answer_key
+from app.catalog import question_catalog
+from app.leaderboard import leaderboard
+from app.quiz import grade_submission
+from app.review import get_review
+from app.sampler import question_sampler
 
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
@@ -66,7 +61,8 @@ def register_user(request: Request, username: str = Form(...), email: str = Form
     if user:
         logging.warning(f"Registration failed: Username {username} & Email {email} already exists.")
         return templates.TemplateResponse("register.html", {"request": request, "error": "Username or Email already exists!"})
-    create_user(db, UserCreate(username=username, email=email, password=password))
+    new_user = create_user(db, UserCreate(username=username, email=email, password=password))
+    leaderboard.set_score(new_user.id, new_user.username, new_user.score)
     logging.info(f"New user registered: {username}")
     return RedirectResponse(url="/login", status_code=303)
 
@@ -115,7 +111,7 @@ def login_user(request: Request, username: str = Form(...), password: str = Form
     if admin and verify_password(password, admin.hashed_password):
         logging.info(f"Admin login successful: {username}")
         response = RedirectResponse(url="/admin", status_code=303)
-        response.set_cookie("is_admin", "true", httponly=True, secure=True)
+        set_session_cookie(response, admin.id, admin.username, "admin")
         return response
 
     # Otherwise, check if it's a normal user
@@ -128,7 +124,7 @@ def login_user(request: Request, username: str = Form(...), password: str = Form
     
     logging.info(f"User login successful: {username}")
     response = RedirectResponse(url="/home", status_code=303)
-    response.set_cookie("user_id", str(user.id), httponly=True, secure=True)
+    set_session_cookie(response, user.id, user.username, "user")
     return response
 
 
@@ -140,7 +136,7 @@ def questions(request: Request, db: Session = Depends(get_db), category: str = N
 
     Args:
         request (Request): The HTTP request object containing metadata about the request.
-        db (Session): The database session used for querying and storing questions.
+        db (Session): The database session used for querying questions.
         category (str): The category to filter questions by (optional).
         difficulty (str): The difficulty to filter questions by (optional).
 
@@ -159,27 +155,25 @@ def questions(request: Request, db: Session = Depends(get_db), category: str = N
         return RedirectResponse(url="/login", status_code=303)
 
     logging.info(f"User {user.username} accessed questions")
-    # Check if questions exist in DB; if not, fetch and store them
-    if db.query(Question).count() == 0:
-        store_questions_in_db(db)
-    
-    # Build the query for fetching questions
-    query = db.query(Question)
-    
-    # Apply filters based on category and difficulty if provided
-    if category:
-        query = query.filter(Question.category == category)
-    if difficulty:
-        query = query.filter(Question.difficulty == difficulty)
+    # The bank is filled by the background ingestion pipeline; resync the sampler and answer key if it changed
+    version = question_catalog.get(db).version
+    question_sampler.sync(version)
+    answer_key.sync(version)
 
-    # Limit to 5 questions
-    questions = query.order_by(func.random()).limit(5).all()
+    # Draw 5 random questions matching the filters
+    question_ids = question_sampler.sample_ids(db, category=category, difficulty=difficulty, k=5)
+
+    # Open the quiz session the submission will be recorded under; its commit
+    # expires loaded rows, so the questions are loaded after it
+    quiz_session_id = create_quiz_session(db, user.id, category, difficulty) if question_ids else None
+    questions = question_sampler.load(db, question_ids)
 
     # Render the template with the questions
     return templates.TemplateResponse("questions.html", {
         "request": request,
         "user": user,
-        "questions": questions
+        "questions": questions,
+        "quiz_session_id": quiz_session_id,
     })
 
 
@@ -196,20 +190,20 @@ def logout():
         Info: When a user logs out.
     """
     response = RedirectResponse(url="/login", status_code=303)
-    response.delete_cookie("user_id")  # Clear session cookie
+    response.delete_cookie(SESSION_COOKIE)  # Clear session cookie
     logging.info("User logged out")
     return response
 
 
 @router.post("/submit-quiz")
-async def submit_quiz(request: Request, db: Session = Depends(get_db)):
+async def submit_quiz(request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Handles POST requests to the /submit-quiz route, extracting form data, validating
     answers, updating user scores and statistics, and rendering the result page.
 
     Args:
         request (Request): The HTTP request object containing metadata about the request.
-        db (Session): The database session used for querying and storing questions and user data.
+        db (AsyncSession): The database session used for querying and storing questions and user data.
 
     Returns:
         TemplateResponse: Renders the result.html template with the request object, score, and
@@ -218,80 +212,35 @@ async def submit_quiz(request: Request, db: Session = Depends(get_db)):
     Logs:
         Info: When a user submits a quiz and receives a score.
     """
-    user = get_current_user(request, db)
+    user = get_session_user(request)
     if not user:
         return RedirectResponse(url="/login", status_code=303)
 
     # Retrieve form data
     form_data = await request.form()
 
-    # Generate a unique session ID (e.g., current timestamp)
-    session_id = int(datetime.utcnow().timestamp())
-
-    # Extract the question IDs
-    question_ids = [int(key[1:]) for key in form_data.keys() if key.startswith("q")]
-    questions = db.query(Question).filter(Question.id.in_(question_ids)).all()
-    score = 0
-
-    for q in questions:
-        user_answer_key = form_data.get(f"q{q.id}")
-
-        # Mapping user selection to actual answer
-        option_mapping = {
-            "a": q.option_a,
-            "b": q.option_b,
-            "c": q.option_c,
-            "d": q.option_d,
-        }
-        user_answer = option_mapping.get(user_answer_key)
-
-        # Check if correct
-        is_correct = user_answer == q.correct_option
-        if is_correct:
-            score += 1
-
-        # Store the attempt
-        attempt = QuizAttempt(
-            user_id=user.id,
-            question_id=q.id,
-            user_answer=user_answer,
-            correct_answer=q.correct_option,
-            is_correct=is_correct,
-            session_id=session_id,
-        )
-        db.add(attempt)
-
-        # Update or create user quiz stats
-        user_quiz_stat = (
-            db.query(UserQuizStats)
-            .filter(
-                UserQuizStats.user_id == user.id,
-                UserQuizStats.category == q.category,
-                UserQuizStats.difficulty == q.difficulty,
-            )
-            .first()
-        )
-
-        if user_quiz_stat:
-            user_quiz_stat.solved_count += 1  # Increment total attempts
-            if is_correct:
-                user_quiz_stat.correct_count += 1  # Increment correct answers
-        else:
-            new_stat = UserQuizStats(
-                user_id=user.id,
-                category=q.category,
-                difficulty=q.difficulty,
-                solved_count=1,
-                correct_count=1 if is_correct else 0,
-            )
-            db.add(new_stat)
-
-    user.score += score
-    db.commit()
-
-    total_attempted = len(questions)
-
-    logging.info(f"User {user.username} submitted a quiz - Score: {score}/{len(questions)}")
+    # The quiz session opened by /questions when the quiz was handed out
+    try:
+        session_id = int(form_data.get("session_id", ""))
+    except ValueError:
+        logging.warning(f"User {user.username} submitted a quiz without a session")
+        return RedirectResponse(url="/home", status_code=303)
+
+    # Map each question ID to the option letter picked for it
+    answers = {int(key[1:]): value for key, value in form_data.items() if key.startswith("q") and key[1:].isdigit()}
+    graded = await grade_submission(db, user, session_id, answers)
+    if graded is None:
+        # The token is not checked against the database; a deleted user has no open session either
+        if not await user_exists(db, user.id):
+            logging.warning(f"Deleted user {user.username} submitted a quiz")
+            return RedirectResponse(url="/login", status_code=303)
+        logging.warning(f"User {user.username} submitted quiz session {session_id}, which is not open")
+        return RedirectResponse(url="/home", status_code=303)
+
+    score = sum(answer.is_correct for answer in graded)
+    total_attempted = len(graded)
+
+    logging.info(f"User {user.username} submitted a quiz - Score: {score}/{total_attempted}")
     return templates.TemplateResponse(
         "result.html",
         {
@@ -304,7 +253,7 @@ async def submit_quiz(request: Request, db: Session = Depends(get_db)):
 
 
 @router.get("/review-quiz")
-async def review_quiz(request: Request, session_id: int, db: Session = Depends(get_db)):
+async def review_quiz(request: Request, session_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Handles GET requests to the /review-quiz route, displaying the latest quiz
     submission's results.
@@ -312,7 +261,7 @@ async def review_quiz(request: Request, session_id: int, db: Session = Depends(g
     Args:
         request (Request): The HTTP request object containing metadata about the request.
         session_id (int): The session ID of the quiz submission to review.
-        db (Session): The database session used for querying the user's attempts.
+        db (AsyncSession): The database session used for querying the user's attempts.
 
     Returns:
         TemplateResponse: Renders the review.html template with the request object and
@@ -321,16 +270,12 @@ async def review_quiz(request: Request, session_id: int, db: Session = Depends(g
     Logs:
         Info: When a user reviews a quiz session.
     """
-    user = get_current_user(request, db)
+    user = get_session_user(request)
     if not user:
         return RedirectResponse(url="/login", status_code=303)
 
-    # Fetch only the latest session
-    latest_attempts = (
-        db.query(QuizAttempt)
-        .filter(QuizAttempt.user_id == user.id, QuizAttempt.session_id == session_id)
-        .all()
-    )
+    # A submitted session never changes, so repeat views are served from memory
+    latest_attempts = await get_review(db, user.id, session_id)
 
     logging.info(f"User {user.username} reviewed quiz session {session_id}")
     return templates.TemplateResponse("review.html", {
@@ -343,7 +288,8 @@ async def review_quiz(request: Request, session_id: int, db: Session = Depends(g
 def start_quiz(request: Request, db: Session = Depends(get_db)):
     """
     Handles GET requests to the /home route, displaying the quiz start page with
-    available categories, difficulty levels, top users, and the current user's stats.
+    available categories, difficulty levels, top users, the current user's rank
+    and stats.
 
     Args:
         request (Request): The HTTP request object containing metadata about the request.
@@ -352,7 +298,8 @@ def start_quiz(request: Request, db: Session = Depends(get_db)):
 
     Returns:
         TemplateResponse: Renders the home.html template with the request object, user,
-            categories, difficulties, top users, and user stats as context.
+            categories, difficulties, top users, the user's rank, and the user's stats with
+            per-category totals as context.
 
     Logs:
         Info: When the quiz start page is rendered.
@@ -361,29 +308,30 @@ def start_quiz(request: Request, db: Session = Depends(get_db)):
     if not user:
         return RedirectResponse(url="/login", status_code=303)
     
-    # Fetch available categories from DB (assuming Question has a category field)
-    categories = db.query(Question.category).distinct().all()
-
-    # Fetch distinct difficulty levels from the DB and extract the values
-    difficulties = db.query(Question.difficulty).distinct().all()
+    # Categories and difficulty levels come from the cached question catalog
+    catalog = question_catalog.get(db)
     
-    top_users = db.query(User).order_by(User.score.desc()).limit(5).all()
+    top_users = leaderboard.top(5)
+    user_rank = leaderboard.rank(user.id)
     
-    user_stats = db.query(UserQuizStats).order_by(UserQuizStats.correct_count.desc()).all()
+    user_stats, category_totals = get_user_stats(db, user.id)
     
     logging.info("Rendering quiz start page")
     return templates.TemplateResponse("home.html", {
         "request": request, 
         "user": user, 
-        "categories": categories,
-        "difficulties": difficulties,
+        "categories": catalog.categories,
+        "difficulties": catalog.difficulties,
         "top_users": top_users,
-        "user_stats": user_stats
+        "user_rank": user_rank,
+        "total_players": len(leaderboard),
+        "user_stats": user_stats,
+        "category_totals": category_totals,
     })
 
 
 @router.post("/home")
-async def start_quiz_post(request: Request, db: Session = Depends(get_db)):
+async def start_quiz_post(request: Request):
     """
     Handles POST requests to the /home route, extracting form data (category and difficulty),
     checking for valid user authentication, logging the quiz start event, and redirecting to
@@ -391,8 +339,6 @@ async def start_quiz_post(request: Request, db: Session = Depends(get_db)):
 
     Args:
         request (Request): The HTTP request object containing metadata about the request.
-        db (Session): The database session used for querying the user's stats and fetching
-            available categories and difficulty levels.
 
     Returns:
         RedirectResponse: Redirects to the questions page with the selected category and
@@ -401,7 +347,7 @@ async def start_quiz_post(request: Request, db: Session = Depends(get_db)):
     Logs:
         Info: When a user starts a new quiz.
     """
-    user = get_current_user(request, db)
+    user = get_session_user(request)
     if not user:
         return RedirectResponse(url="/login", status_code=303)
     
@@ -0,0 +1,141 @@
+import random
+import threading
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from sqlalchemy.orm import Session
+from app.models import Question
+
+
+class QuestionSampler:
+    """
+    Keeps the IDs of every question in memory, bucketed by (category, difficulty),
+    so a quiz can draw its questions without asking the database to sort the
+    whole questions table on every request.
+
+    The buckets are loaded lazily on first use and kept up to date by the admin
+    question routes, which advance() them to the catalog version their own
+    write produced. sync() drops them only when the version moved otherwise,
+    which covers changes made by other workers or by a bulk import.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pools = None  # {(category, difficulty): array of question IDs}
+        self._version = None  # catalog version the buckets were loaded for
+
+    def _ensure_loaded(self, db: Session):
+        if self._pools is not None:
+            return
+        pools = {}
+        rows = db.query(Question.id, Question.category, Question.difficulty).yield_per(10000)
+        for question_id, category, difficulty in rows:
+            pools.setdefault((category, difficulty), array("q")).append(question_id)
+        self._pools = pools
+
+    def invalidate(self):
+        """Drops the cached buckets; they are reloaded on the next draw."""
+        with self._lock:
+            self._pools = None
+
+    def sync(self, version: int):
+        """Drops the buckets if they were loaded for another catalog version."""
+        with self._lock:
+            if self._version != version:
+                self._pools = None
+                self._version = version
+
+    def advance(self, version: int):
+        """
+        Records that this worker's own write, already applied with add(),
+        move() or discard(), produced catalog `version`. If the buckets were not
+        current for the version just before, a write from elsewhere came in
+        between and the next sync() drops them.
+        """
+        with self._lock:
+            if self._version is not None and self._version == version - 1:
+                self._version = version
+
+    def add(self, question_id: int, category: str, difficulty: str):
+        """Registers a newly created question."""
+        with self._lock:
+            if self._pools is not None:
+                self._pools.setdefault((category, difficulty), array("q")).append(question_id)
+
+    def discard(self, question_id: int):
+        """Removes a question from whichever bucket holds it."""
+        with self._lock:
+            if self._pools is None:
+                return
+            for key, ids in self._pools.items():
+                try:
+                    position = ids.index(question_id)
+                except ValueError:
+                    continue
+                # Swap with the last ID so removal does not shift the array
+                ids[position] = ids[-1]
+                ids.pop()
+                if not ids:
+                    del self._pools[key]
+                return
+
+    def move(self, question_id: int, category: str, difficulty: str):
+        """Re-buckets a question whose category or difficulty was edited."""
+        self.discard(question_id)
+        self.add(question_id, category, difficulty)
+
+    def size(self, db: Session) -> int:
+        """Returns the number of questions in the bank."""
+        with self._lock:
+            self._ensure_loaded(db)
+            return sum(len(ids) for ids in self._pools.values())
+
+    def sample_ids(self, db: Session, category: str = None, difficulty: str = None, k: int = 5) -> list:
+        """
+        Draws up to k distinct question IDs uniformly at random from the questions
+        matching the optional category and difficulty filters.
+
+        The matching buckets are treated as one virtual array, so the draw costs
+        O(k log b) for b matching buckets regardless of how many questions exist.
+        """
+        with self._lock:
+            self._ensure_loaded(db)
+            pools = [
+                ids for (pool_category, pool_difficulty), ids in self._pools.items()
+                if (not category or pool_category == category)
+                and (not difficulty or pool_difficulty == difficulty)
+            ]
+            offsets = list(accumulate(len(ids) for ids in pools))
+            total = offsets[-1] if offsets else 0
+
+            sampled = []
+            for index in random.sample(range(total), min(k, total)):
+                pool = bisect_right(offsets, index)
+                start = offsets[pool - 1] if pool else 0
+                sampled.append(pools[pool][index - start])
+            return sampled
+
+    def sample(self, db: Session, category: str = None, difficulty: str = None, k: int = 5) -> list:
+        """
+        Draws up to k random questions and loads only those rows by primary key.
+
+        Returns:
+            list[Question]: The sampled questions, in draw order.
+        """
+        return self.load(db, self.sample_ids(db, category, difficulty, k))
+
+    def load(self, db: Session, question_ids: list) -> list:
+        """
+        Loads sampled questions by primary key with one query.
+
+        Returns:
+            list[Question]: The questions, in the order of question_ids.
+        """
+        if not question_ids:
+            return []
+        rows = {q.id: q for q in db.query(Question).filter(Question.id.in_(question_ids))}
+        # IDs deleted by another worker since the buckets were loaded are skipped
+        return [rows[question_id] for question_id in question_ids if question_id in rows]
+
+
+question_sampler = QuestionSampler()
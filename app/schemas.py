@@ -1,3 +1,4 @@
+from typing import Literal, Optional
 from pydantic import BaseModel, EmailStr
 
 class UserCreate(BaseModel):
@@ -8,3 +9,72 @@ class UserCreate(BaseModel):
 class UserLogin(BaseModel):
     username: str
     password: str
+
+
+# /api/v1 payloads. Answers travel as option letters (a-d) rather than
+# repeating the option text, which the client already has from the quiz.
+OptionLetter = Literal["a", "b", "c", "d"]
+
+class TokenResponse(BaseModel):
+    token: str
+    expires_in: int  # seconds
+
+class QuestionOut(BaseModel):
+    id: int
+    text: str
+    category: str
+    difficulty: str
+    options: list[str]  # in letter order
+
+class QuizOut(BaseModel):
+    session_id: Optional[int]  # None when no question matches the filters
+    questions: list[QuestionOut]
+
+class QuizSubmission(BaseModel):
+    answers: dict[int, OptionLetter]  # question ID -> picked option
+
+class AnswerOut(BaseModel):
+    question_id: int
+    answer: Optional[OptionLetter]
+    correct: Optional[OptionLetter]  # None when the stored answer matches no option
+    is_correct: bool
+
+class QuizResultOut(BaseModel):
+    session_id: int
+    score: int
+    total: int
+    answers: list[AnswerOut]
+
+class ReviewItemOut(BaseModel):
+    question_id: int
+    text: str
+    options: list[str]
+    answer: Optional[OptionLetter]
+    correct: Optional[OptionLetter]
+    is_correct: bool
+
+class ReviewOut(BaseModel):
+    session_id: int
+    items: list[ReviewItemOut]
+
+class StatOut(BaseModel):
+    category: str
+    difficulty: Optional[str]  # None on per-category totals
+    solved: int
+    correct: int
+
+class StatsOut(BaseModel):
+    score: int
+    rank: Optional[int]
+    total_players: int
+    stats: list[StatOut]
+    category_totals: list[StatOut]
+
+class LeaderboardEntryOut(BaseModel):
+    rank: int
+    username: str
+    score: int
+
+class LeaderboardOut(BaseModel):
+    total_players: int
+    entries: list[LeaderboardEntryOut]
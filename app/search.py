@@ -0,0 +1,46 @@
+from sqlalchemy import Float, cast, func, or_
+from sqlalchemy.orm import Session
+from app.models import Question
+from app.pagination import DEFAULT_PAGE_SIZE, Page, keyset_page
+
+
+def search_questions(db: Session, term: str, cursor: str = None, page_size: int = DEFAULT_PAGE_SIZE) -> Page:
+    """
+    Searches the question bank for the admin question list.
+
+    A question matches when its full-text vector matches the search words, when
+    the raw term appears inside its text or category, or when the term is its
+    difficulty (any case). The first condition is served by the search_vector
+    GIN index, the substring conditions by the pg_trgm GIN indexes and the
+    difficulty by the lower(difficulty) btree, so no predicate needs a full
+    scan. Results are ranked by ts_rank_cd, best first, then by ID.
+
+    Args:
+        db (Session): The database session.
+        term (str): The search term typed by the admin.
+        cursor (str): The next_cursor of the previous page, or None for the first page.
+        page_size (int): The number of questions per page.
+
+    Returns:
+        Page: The matching questions of the page and the cursor of the next page.
+    """
+    query = func.websearch_to_tsquery("english", term)
+    pattern = f"%{term}%"
+    # ts_rank_cd returns real; the cursor carries the rank back as a double, and
+    # 0.4::real = 0.4 is false, so rank and order by the double to keep ties intact
+    rank = cast(func.ts_rank_cd(Question.search_vector, query), Float(53))
+
+    matches = db.query(Question, rank.label("rank")).filter(or_(
+        Question.search_vector.op("@@")(query),
+        Question.question_text.ilike(pattern),
+        Question.category.ilike(pattern),
+        func.lower(Question.difficulty) == term.strip().lower(),
+    ))
+    page = keyset_page(
+        matches,
+        order_by=[(rank, True), (Question.id, False)],
+        key=lambda row: (row.rank, row.Question.id),
+        cursor=cursor,
+        page_size=page_size,
+    )
+    return Page([row.Question for row in page.rows], page.next_cursor)
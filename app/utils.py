@@ -1,99 +1,99 @@
-import random
-import requests
+import os
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple
+from dotenv import load_dotenv
 from fastapi import Request
-from passlib.context import CryptContext
+from jose import JWTError, jwt
 from sqlalchemy.orm import Session
-from app.models import Question, User
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app.hashing import hashing_pool, bcrypt_hash, bcrypt_verify
+from app.models import User
 
+# bcrypt runs on the bounded hashing pool; both calls raise a 503 when it is saturated
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return hashing_pool.run(bcrypt_hash, password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return hashing_pool.run(bcrypt_verify, plain_password, hashed_password)
+
+load_dotenv()
+
+SECRET_KEY = os.getenv("SECRET_KEY")  # required; checked by check_secret_key() at startup
+SESSION_COOKIE = "session"
+SESSION_ALGORITHM = "HS256"
+SESSION_TTL = timedelta(minutes=int(os.getenv("SESSION_TTL_MINUTES", 12 * 60)))
+
+
+def check_secret_key():
+    """Raises at startup if SECRET_KEY is unset, rather than failing every login later."""
+    if not SECRET_KEY:
+        raise RuntimeError("SECRET_KEY is not set; session tokens cannot be signed without it")
+
+
+class SessionUser(NamedTuple):
+    """The identity carried by a session token: enough to authorize without a query."""
+    id: int
+    username: str
+    role: str  # "user" or "admin"
+
+
+def create_session_token(user_id: int, username: str, role: str) -> str:
+    """Creates a signed, expiring session token for the given identity."""
+    claims = {
+        "sub": str(user_id),
+        "name": username,
+        "role": role,
+        "exp": datetime.now(timezone.utc) + SESSION_TTL,
+    }
+    return jwt.encode(claims, SECRET_KEY, algorithm=SESSION_ALGORITHM)
+
+def set_session_cookie(response, user_id: int, username: str, role: str):
+    response.set_cookie(
+        SESSION_COOKIE,
+        create_session_token(user_id, username, role),
+        max_age=int(SESSION_TTL.total_seconds()),
+        httponly=True,
+        secure=True,
+        samesite="lax",
+    )
+
+def get_session(request: Request):
+    """
+    Decodes the session token of the request, taken from the session cookie or,
+    for API clients, from an "Authorization: Bearer <token>" header.
+
+    Returns:
+        SessionUser: The identity in the token, or None if the token is missing,
+            tampered with or expired.
+    """
+    token = request.cookies.get(SESSION_COOKIE)
+    if not token:
+        scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+        token = credentials if scheme.lower() == "bearer" else None
+    if not token:
+        return None
+    try:
+        claims = jwt.decode(token, SECRET_KEY, algorithms=[SESSION_ALGORITHM])
+        session = SessionUser(int(claims["sub"]), claims["name"], claims["role"])
+    except (JWTError, KeyError, ValueError):
+        return None
+    # Picked up by the request log records
+    request.state.user_id = session.id
+    return session
+
+def get_session_user(request: Request):
+    """Returns the logged-in quiz user from the session token, without a DB query."""
+    session = get_session(request)
+    if not session or session.role != "user":
+        return None
+    return session
+
+def is_admin_session(request: Request) -> bool:
+    session = get_session(request)
+    return session is not None and session.role == "admin"
 
 def get_current_user(request: Request, db: Session):
-    user_id = request.cookies.get("user_id")
-    if not user_id:
+    """Loads the logged-in user's row, for routes that need fresh score or token values."""
+    session = get_session_user(request)
+    if not session:
         return None
-    return db.query(User).filter(User.id == int(user_id)).first()
-
-
-def store_questions_in_db(db: Session):
-    # URLs for fetching questions
-    urls = [
-        "https://opentdb.com/api.php?amount=50&category=18&type=multiple",
-        "https://opentdb.com/api.php?amount=50&category=9&type=multiple",
-        "https://opentdb.com/api.php?amount=50&category=23&type=multiple"
-    ]
-
-    # Delete all existing questions from the database before adding new ones
-    # db.query(Question).delete()
-
-    # Iterate over each URL and fetch the questions
-    for url in urls:
-        print(f"Fetching questions from: {url}")
-        try:
-            response = requests.get(url).json()
-
-            # Print the entire response to understand the structure
-            print(f"Response from URL {url}: {response}")
-
-            # Check for a valid response and handle empty results
-            if response.get("response_code") == 5:
-                print(f"Error: No questions found for URL: {url}")
-                continue
-
-            # Check if the response contains 'results' and is valid
-            if isinstance(response, dict) and 'results' in response:
-                questions = response['results']
-                print(f"Found {len(questions)} questions from URL: {url}")
-
-                # Loop through the questions and insert into the database
-                for item in questions:
-                    question_text = item['question']
-                    correct_answer = item['correct_answer']
-                    incorrect_answers = item['incorrect_answers']
-                    category = item.get('category', 'General Knowledge')
-                    difficulty = item.get('difficulty', 'easy')
-
-                    # Shuffle answers
-                    all_answers = [correct_answer] + incorrect_answers
-                    random.shuffle(all_answers)
-
-                    # Ensure answers list contains 4 options
-                    if len(all_answers) < 4:
-                        continue
-
-                    option_a = all_answers[0]
-                    option_b = all_answers[1]
-                    option_c = all_answers[2] if len(all_answers) > 2 else None
-                    option_d = all_answers[3] if len(all_answers) > 3 else None
-
-                    # Add new question to the database
-                    new_question = Question(
-                        category=category,
-                        difficulty=difficulty,
-                        question_text=question_text,
-                        option_a=option_a,
-                        option_b=option_b,
-                        option_c=option_c,
-                        option_d=option_d,
-                        correct_option=correct_answer
-                    )
-                    db.add(new_question)
-
-                # Commit after processing each URL's questions
-                db.commit()
-
-                print(f"Successfully added {len(questions)} questions from URL: {url}")
-            else:
-                print(f"Error: No 'results' key found in the response for URL: {url}")
-
-        except requests.exceptions.RequestException as e:
-            print(f"Request error for URL {url}: {e}")
-        except Exception as e:
-            print(f"An unexpected error occurred for URL {url}: {e}")
-
-    print("All questions from all URLs have been processed and stored.")
+    return db.query(User).filter(User.id == session.id).first()
@@ -0,0 +1,96 @@
+"""
+Measures requests/sec of the quiz routes served by a running instance at
+several levels of concurrent clients.
+
+Start the app (e.g. `uvicorn app.main:app --workers 1`), then run:
+
+    python -m benchmarks.concurrency_benchmark --base-url http://127.0.0.1:8000 \
+        --clients 50 200 1000 --duration 20
+
+Each client loops over POST /home, GET /questions, POST /submit-quiz and
+GET /review-quiz as one logged-in user. Run it once against the old build and once against the
+new one to compare.
+"""
+import argparse
+import asyncio
+import re
+import time
+import uuid
+import httpx
+
+
+async def login(client):
+    username = f"bench_{uuid.uuid4().hex[:10]}"
+    await client.post("/register", data={"username": username, "email": f"{username}@example.com", "password": "bench"})
+    response = await client.post("/login", data={"username": username, "password": "bench"})
+    if response.status_code != 303:
+        raise SystemExit(f"Login failed for {username}: HTTP {response.status_code}")
+    # The session cookies are marked secure, so forward them explicitly over plain HTTP
+    return "; ".join(f"{name}={value}" for name, value in response.cookies.items())
+
+
+async def quiz_form(client, headers):
+    response = await client.get("/questions", headers=headers)
+    form = {f"q{question_id}": "a" for question_id in re.findall(r'name="q(\d+)"', response.text)}
+    form.update(re.findall(r'<input type="hidden" name="(\w+)" value="([^"]*)"', response.text))
+    if not any(key.startswith("q") for key in form):
+        raise SystemExit("The question bank is empty; seed it before benchmarking.")
+    return form
+
+
+async def client_loop(client, headers, form, deadline, counters):
+    session_id = None
+    while time.perf_counter() < deadline:
+        for step in ("start", "questions", "submit", "review"):
+            try:
+                if step == "start":
+                    response = await client.post("/home", data={"category": "", "difficulty": ""}, headers=headers)
+                elif step == "questions":
+                    # Every quiz is handed out under its own session, which can be submitted once
+                    form = await quiz_form(client, headers)
+                    counters["ok"] += 1
+                    continue
+                elif step == "submit":
+                    response = await client.post("/submit-quiz", data=form, headers=headers)
+                    match = re.search(r"session_id=(\d+)", response.text)
+                    session_id = match.group(1) if match else session_id
+                else:
+                    if session_id is None:
+                        continue
+                    response = await client.get("/review-quiz", params={"session_id": session_id}, headers=headers)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            counters["ok" if ok else "errors"] += 1
+
+
+async def run_level(base_url, clients, duration, headers, form):
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        counters = {"ok": 0, "errors": 0}
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(*(client_loop(client, headers, form, deadline, counters) for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+    return counters["ok"] / elapsed, counters["errors"]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--clients", type=int, nargs="+", default=[50, 200, 1000])
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60) as client:
+        headers = {"Cookie": await login(client)}
+        form = await quiz_form(client, headers)
+
+    print(f"{'clients':>8} | {'req/s':>10} | {'errors':>7}")
+    for clients in args.clients:
+        throughput, errors = await run_level(args.base_url, clients, args.duration, headers, form)
+        print(f"{clients:>8} | {throughput:>10.1f} | {errors:>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
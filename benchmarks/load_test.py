@@ -0,0 +1,240 @@
+"""
+End-to-end load test of a running instance with simulated users.
+
+Each player registers, logs in (sign-ups are spread over --ramp-up seconds,
+as bcrypt work is deliberately bounded) and then loops over GET /home, GET /questions,
+POST /submit-quiz and GET /review-quiz. Admin users log in and search
+/admin/questions, following the next-page cursor now and then. The run
+reports throughput, latency percentiles and error rates per endpoint and
+saves them as JSON so runs can be compared.
+
+The app relies on Postgres features (full-text search, ON CONFLICT, COPY), so
+run it against a local Postgres. --seed-questions loads a synthetic question
+bank into the database configured in .env (the one the app under test uses):
+
+    uvicorn app.main:app --workers 2 &
+    python -m benchmarks.load_test --users 50 --admins 5 --duration 60 \
+        --seed-questions 10000 --output results/load_test.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import subprocess
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timezone
+import httpx
+
+SEARCH_TERMS = ["science", "history", "capital", "planet", "computer", "easy", "hard", "war", "art", "river"]
+PERCENTILES = (50, 90, 95, 99)
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies = defaultdict(list)  # endpoint -> seconds
+        self.errors = defaultdict(int)      # endpoint -> failed requests
+
+    async def request(self, client, endpoint, method, url, expected, **kwargs):
+        """Sends one request and records it under `endpoint`; returns the response or None."""
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        self.latencies[endpoint].append(time.perf_counter() - started)
+        if response is None or response.status_code != expected:
+            self.errors[endpoint] += 1
+            return None
+        return response
+
+
+def session_cookie(client, response):
+    # The session cookie is marked secure, so it is forwarded explicitly over plain
+    # HTTP; the shared client must not keep it, or users would share sessions
+    client.cookies.clear()
+    return {"Cookie": "; ".join(f"{name}={value}" for name, value in response.cookies.items())}
+
+
+async def player(client, recorder, rng, run_id, index, deadline, think_time, start_delay):
+    await asyncio.sleep(start_delay)
+    username = f"load_{run_id}_{index}"
+    password = "load-test"
+    await recorder.request(client, "POST /register", "POST", "/register", 303, data={
+        "username": username, "email": f"{username}@example.com", "password": password,
+    })
+    response = await recorder.request(client, "POST /login", "POST", "/login", 303,
+                                      data={"username": username, "password": password})
+    if response is None:
+        return
+    headers = session_cookie(client, response)
+
+    while time.perf_counter() < deadline:
+        await recorder.request(client, "GET /home", "GET", "/home", 200, headers=headers)
+        response = await recorder.request(client, "GET /questions", "GET", "/questions", 200, headers=headers)
+        if response is None:
+            continue
+        form = dict(re.findall(r'<input type="hidden" name="(\w+)" value="([^"]*)"', response.text))
+        for question_id in set(re.findall(r'name="q(\d+)"', response.text)):
+            form[f"q{question_id}"] = rng.choice("abcd")
+        if think_time:
+            await asyncio.sleep(rng.uniform(0, think_time))
+
+        response = await recorder.request(client, "POST /submit-quiz", "POST", "/submit-quiz", 200,
+                                          data=form, headers=headers)
+        match = re.search(r"session_id=(\d+)", response.text) if response is not None else None
+        if match:
+            await recorder.request(client, "GET /review-quiz", "GET", "/review-quiz", 200,
+                                   params={"session_id": match.group(1)}, headers=headers)
+
+
+async def admin(client, recorder, rng, admin_username, admin_password, deadline, think_time):
+    response = await recorder.request(client, "POST /login (admin)", "POST", "/login", 303,
+                                      data={"username": admin_username, "password": admin_password})
+    if response is None:
+        return
+    headers = session_cookie(client, response)
+
+    while time.perf_counter() < deadline:
+        params = {"search": rng.choice(SEARCH_TERMS)}
+        response = await recorder.request(client, "GET /admin/questions?search", "GET", "/admin/questions", 200,
+                                          params=params, headers=headers)
+        # Follow the next page of results every third search
+        match = re.search(r'cursor=([\w-]+)', response.text) if response is not None else None
+        if match and rng.random() < 1 / 3:
+            await recorder.request(client, "GET /admin/questions?search&cursor", "GET", "/admin/questions", 200,
+                                   params=dict(params, cursor=match.group(1)), headers=headers)
+        if think_time:
+            await asyncio.sleep(rng.uniform(0, think_time))
+
+
+def percentile(sorted_samples, p):
+    # Nearest-rank percentile
+    index = max(0, min(len(sorted_samples) - 1, int(round(p / 100 * len(sorted_samples))) - 1))
+    return sorted_samples[index]
+
+
+def summarize(recorder, elapsed):
+    endpoints = {}
+    for endpoint, samples in sorted(recorder.latencies.items()):
+        samples = sorted(samples)
+        errors = recorder.errors[endpoint]
+        endpoints[endpoint] = {
+            "requests": len(samples),
+            "errors": errors,
+            "error_rate": errors / len(samples),
+            "throughput_rps": len(samples) / elapsed,
+            **{f"p{p}_ms": percentile(samples, p) * 1000 for p in PERCENTILES},
+            "max_ms": samples[-1] * 1000,
+        }
+    total = sum(summary["requests"] for summary in endpoints.values())
+    errors = sum(summary["errors"] for summary in endpoints.values())
+    return endpoints, {
+        "requests": total,
+        "errors": errors,
+        "error_rate": errors / total if total else 0.0,
+        "throughput_rps": total / elapsed,
+    }
+
+
+def seed_questions(count, seed):
+    """Loads `count` synthetic questions through the bulk loader; existing ones are skipped."""
+    rng = random.Random(seed)
+    categories = ["Science: Computers", "General Knowledge", "History", "Geography", "Art"]
+    with tempfile.NamedTemporaryFile("w", suffix=".jsonl", delete=False) as source:
+        for n in range(count):
+            words = rng.sample(SEARCH_TERMS, 3)
+            source.write(json.dumps({
+                "category": rng.choice(categories),
+                "difficulty": rng.choice(["easy", "medium", "hard"]),
+                "question_text": f"Load test question {n}: which {words[0]} is linked to the {words[1]} of {words[2]}?",
+                "option_a": f"{words[0]} {n}",
+                "option_b": f"{words[1]} {n}",
+                "option_c": f"{words[2]} {n}",
+                "option_d": f"none {n}",
+                "correct_option": rng.choice("ABCD"),
+            }) + "\n")
+    try:
+        from app.loader import load_file
+        return load_file(source.name, "jsonl")
+    finally:
+        os.unlink(source.name)
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args):
+    run_id = f"{args.seed}_{uuid.uuid4().hex[:6]}"
+    limits = httpx.Limits(max_connections=args.users + args.admins)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        recorder = Recorder()
+        started = time.perf_counter()
+        deadline = started + args.duration
+        await asyncio.gather(
+            *(player(client, recorder, random.Random(f"{args.seed}-player-{i}"), run_id, i, deadline, args.think_time,
+                     args.ramp_up * i / args.users)
+              for i in range(args.users)),
+            *(admin(client, recorder, random.Random(f"{args.seed}-admin-{i}"), args.admin_username,
+                    args.admin_password, deadline, args.think_time)
+              for i in range(args.admins)),
+        )
+        elapsed = time.perf_counter() - started
+    return summarize(recorder, elapsed), elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=20, help="concurrent players")
+    parser.add_argument("--admins", type=int, default=2, help="concurrent admins searching questions")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds of load, sign-up included")
+    parser.add_argument("--ramp-up", type=float, default=5.0, help="seconds over which the players' sign-ups are spread")
+    parser.add_argument("--think-time", type=float, default=0.0, help="max random pause between steps, in seconds")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout, in seconds")
+    parser.add_argument("--seed", type=int, default=42, help="seeds the answers, searches and synthetic questions")
+    parser.add_argument("--seed-questions", type=int, default=0, help="synthetic questions to load before the run")
+    parser.add_argument("--admin-username", default="admin")
+    parser.add_argument("--admin-password", default="admin123")
+    parser.add_argument("--output", help="where to save the JSON results")
+    args = parser.parse_args()
+
+    if args.seed_questions:
+        print(f"Seeded questions: {seed_questions(args.seed_questions, args.seed)}")
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    (endpoints, totals), elapsed = asyncio.run(run(args))
+
+    print(f"{args.users} players, {args.admins} admins, {elapsed:.1f}s")
+    print(f"{'endpoint':>36} | {'requests':>8} | {'req/s':>7} | {'errors':>7} | "
+          + " | ".join(f"{f'p{p}':>8}" for p in PERCENTILES))
+    for endpoint, summary in endpoints.items():
+        print(f"{endpoint:>36} | {summary['requests']:>8} | {summary['throughput_rps']:>7.1f} | "
+              f"{summary['error_rate']:>6.1%} | "
+              + " | ".join(f"{summary[f'p{p}_ms']:>6.1f}ms" for p in PERCENTILES))
+    print(f"{'total':>36} | {totals['requests']:>8} | {totals['throughput_rps']:>7.1f} | {totals['error_rate']:>6.1%} |")
+
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+        with open(args.output, "w") as results:
+            json.dump({
+                "started_at": started_at,
+                "git_revision": git_revision(),
+                "settings": vars(args),
+                "elapsed_seconds": elapsed,
+                "totals": totals,
+                "endpoints": endpoints,
+            }, results, indent=2)
+        print(f"Results saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
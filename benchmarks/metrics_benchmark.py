@@ -0,0 +1,101 @@
+"""
+Measures the per-request overhead of the metrics middleware and the
+per-statement overhead of the DB query hooks.
+
+Requests are driven straight through the ASGI interface of a minimal FastAPI
+app (no sockets), so the difference between the two runs is the middleware
+itself. Statements run against an in-memory SQLite engine for the same reason.
+
+    python -m benchmarks.metrics_benchmark --requests 20000 --statements 50000
+"""
+import argparse
+import asyncio
+import time
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+from app.metrics import MetricsMiddleware, MetricsRegistry, RequestCost, current_request_cost, instrument_engine
+
+
+def build_app(with_metrics: bool):
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: int):
+        return {"id": item_id}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware, registry=MetricsRegistry())
+    return app
+
+
+async def drive(app, requests):
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    timings = []
+    for i in range(requests):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+            "scheme": "http", "path": f"/items/{i}", "raw_path": f"/items/{i}".encode(), "root_path": "",
+            "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("testserver", 80),
+        }
+        started = time.perf_counter()
+        await app(scope, receive, send)
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def request_overhead(requests):
+    results = {}
+    for with_metrics in (False, True):
+        app = build_app(with_metrics)
+        asyncio.run(drive(app, 1000))  # warm up
+        timings = sorted(asyncio.run(drive(app, requests)))
+        results[with_metrics] = (sum(timings) / len(timings), timings[len(timings) // 2])
+    return results
+
+
+def statement_overhead(statements):
+    results = {}
+    for instrumented in (False, True):
+        engine = create_engine("sqlite://")
+        if instrumented:
+            instrument_engine(engine)
+        token = current_request_cost.set(RequestCost())
+        with engine.connect() as connection:
+            query = text("SELECT 1")
+            for _ in range(1000):  # warm up the statement cache
+                connection.execute(query)
+            started = time.perf_counter()
+            for _ in range(statements):
+                connection.execute(query)
+            results[instrumented] = (time.perf_counter() - started) / statements
+        current_request_cost.reset(token)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--statements", type=int, default=50000)
+    args = parser.parse_args()
+
+    requests = request_overhead(args.requests)
+    print(f"{args.requests} requests through the ASGI app")
+    print(f"{'':>20} | {'mean':>10} | {'p50':>10}")
+    print(f"{'without middleware':>20} | {requests[False][0] * 1e6:>8.1f}us | {requests[False][1] * 1e6:>8.1f}us")
+    print(f"{'with middleware':>20} | {requests[True][0] * 1e6:>8.1f}us | {requests[True][1] * 1e6:>8.1f}us")
+    print(f"{'overhead':>20} | {(requests[True][0] - requests[False][0]) * 1e6:>8.1f}us |")
+
+    statements = statement_overhead(args.statements)
+    print(f"\n{args.statements} statements on SQLite")
+    print(f"{'without hooks':>20} | {statements[False] * 1e6:>8.1f}us")
+    print(f"{'with hooks':>20} | {statements[True] * 1e6:>8.1f}us")
+    print(f"{'overhead':>20} | {(statements[True] - statements[False]) * 1e6:>8.1f}us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Integration test fixtures. The tests run the app in-process with TestClient
+against the database configured in .env, which must be migrated to head;
+they are skipped when it cannot be reached. Everything a test creates is
+named with TEST_PREFIX and removed at the end of the session.
+"""
+import os
+import re
+import uuid
+
+# Before the app is imported: one hashing process, no ingestion run at startup
+# and a signing key, which is not kept in .env
+os.environ.setdefault("HASH_POOL_SIZE", "1")
+os.environ.setdefault("INGEST_ON_STARTUP", "never")
+os.environ.setdefault("SECRET_KEY", f"pytest-{uuid.uuid4().hex}")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text, update
+from app.catalog import bump_catalog_version
+from app.database import SessionLocal, engine
+from app.models import Question
+
+TEST_PREFIX = f"pytest_{uuid.uuid4().hex[:8]}"
+TEST_CATEGORY = TEST_PREFIX  # every test question is in it, so quizzes draw only those
+PASSWORD = "pytest-password"
+
+
+def database_available() -> bool:
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return True
+    except Exception:
+        return False
+
+
+def cleanup():
+    with SessionLocal() as db:
+        users = "SELECT id FROM users WHERE username LIKE :prefix"
+        questions = "SELECT id FROM questions WHERE category = :category"
+        params = {"prefix": f"{TEST_PREFIX}%", "category": TEST_CATEGORY}
+        db.execute(text(f"DELETE FROM quiz_attempts WHERE user_id IN ({users}) OR question_id IN ({questions})"), params)
+        db.execute(text(f"DELETE FROM user_quiz_stats WHERE user_id IN ({users})"), params)
+        db.execute(text(f"DELETE FROM quiz_sessions WHERE user_id IN ({users})"), params)
+        db.execute(text("DELETE FROM users WHERE username LIKE :prefix"), params)
+        db.execute(text("DELETE FROM questions WHERE category = :category"), params)
+        db.commit()
+
+
+@pytest.fixture(scope="session")
+def test_questions():
+    """Ten questions in their own category; the correct answer is always option b."""
+    if not database_available():
+        pytest.skip("database not reachable")
+    with SessionLocal() as db:
+        questions = [
+            Question(
+                question_text=f"{TEST_PREFIX} question {n}?",
+                option_a=f"wrong {n}", option_b=f"right {n}", option_c=f"other {n}", option_d=f"none {n}",
+                correct_option=f"right {n}", category=TEST_CATEGORY, difficulty="easy", admincreated=True,
+            )
+            for n in range(10)
+        ]
+        db.add_all(questions)
+        db.commit()
+        ids = [q.id for q in questions]
+    yield ids
+    cleanup()
+
+
+@pytest.fixture(scope="session")
+def client(test_questions):
+    # The questions exist before startup, so the answer key and sampler load them
+    from app.main import app
+    with TestClient(app, base_url="https://testserver") as client:
+        yield client
+
+
+@pytest.fixture
+def user(client):
+    """Registers a fresh user and logs the client in as them; returns the username."""
+    username = f"{TEST_PREFIX}_{uuid.uuid4().hex[:8]}"
+    client.post("/register", data={"username": username, "email": f"{username}@example.com", "password": PASSWORD})
+    response = client.post("/login", data={"username": username, "password": PASSWORD}, follow_redirects=False)
+    assert response.status_code == 303
+    return username
+
+
+def quiz_form(page: str, letter: str = "b") -> dict:
+    """Builds the /submit-quiz form for a rendered /questions page, answering `letter` everywhere."""
+    form = {f"q{question_id}": letter for question_id in dict.fromkeys(re.findall(r'name="q(\d+)"', page))}
+    form["session_id"] = re.search(r'name="session_id" value="(\d+)"', page).group(1)
+    return form
+
+
+def set_correct_option(value):
+    """
+    Sets the correct answer of every test question to `value` (a string or a
+    column such as Question.option_a) and bumps the catalog version, as an edit
+    made by another worker would.
+    """
+    with SessionLocal() as db:
+        db.execute(update(Question).where(Question.category == TEST_CATEGORY).values(correct_option=value))
+        bump_catalog_version(db)
+        db.commit()
@@ -0,0 +1,22 @@
+from app.database import SessionLocal
+from app.models import Question
+
+
+def test_question_admin_routes_need_admin_session(client, user, test_questions):
+    question_id = test_questions[0]
+    form = {
+        "question_text": "changed", "option_a": "a", "option_b": "b", "option_c": "c", "option_d": "d",
+        "correct_option": "A", "category": "changed", "difficulty": "changed",
+    }
+    responses = [
+        client.get("/admin/questions", follow_redirects=False),
+        client.get("/admin/create-question", follow_redirects=False),
+        client.get(f"/admin/edit-question/{question_id}", follow_redirects=False),
+        client.post(f"/admin/edit-question/{question_id}", data=form, follow_redirects=False),
+        client.post(f"/admin/delete-question/{question_id}", follow_redirects=False),
+    ]
+    assert [(response.status_code, response.headers.get("location")) for response in responses] == [(303, "/login")] * 5
+
+    with SessionLocal() as db:
+        question = db.get(Question, question_id)
+    assert question is not None and question.question_text != "changed"
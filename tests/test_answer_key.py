@@ -0,0 +1,35 @@
+from sqlalchemy import select
+from app.answerkey import answer_key
+from app.catalog import bump_catalog_version
+from app.database import SessionLocal
+from app.models import Question, QuizAttempt
+from tests.conftest import TEST_CATEGORY, quiz_form, set_correct_option
+
+
+def test_submission_graded_after_foreign_edit(client, user):
+    form = quiz_form(client.get("/questions", params={"category": TEST_CATEGORY}).text)
+    set_correct_option(Question.option_a)
+    try:
+        # The key in this worker still says option b; the submission must not be graded from it
+        assert client.post("/submit-quiz", data=form).status_code == 200
+        with SessionLocal() as db:
+            rows = db.execute(
+                select(QuizAttempt.correct_option, QuizAttempt.is_correct)
+                .where(QuizAttempt.session_id == int(form["session_id"]))
+            ).all()
+        assert rows and all(row == (0, False) for row in rows)
+    finally:
+        set_correct_option(Question.option_b)
+
+
+def test_own_write_advances_key():
+    with SessionLocal() as db:
+        answer_key.load(db)
+        version = bump_catalog_version(db)
+        db.commit()
+    answer_key.advance(version)
+    assert answer_key._version == version
+
+    # A bump from elsewhere in between leaves the key stale
+    answer_key.advance(version + 2)
+    assert answer_key._version == version
@@ -0,0 +1,16 @@
+from app.models import Question
+from tests.conftest import TEST_CATEGORY, set_correct_option
+
+
+def test_submit_answer_matching_no_option(client, user):
+    quiz = client.get("/api/v1/quiz", params={"category": TEST_CATEGORY}).json()
+    set_correct_option("matches no option")
+    try:
+        answers = {question["id"]: "b" for question in quiz["questions"]}
+        response = client.post(f"/api/v1/quiz/{quiz['session_id']}/submit", json={"answers": answers})
+    finally:
+        set_correct_option(Question.option_b)
+    assert response.status_code == 200
+    result = response.json()
+    assert result["score"] == 0
+    assert all(answer["correct"] is None and not answer["is_correct"] for answer in result["answers"])
@@ -0,0 +1,21 @@
+from sqlalchemy import func, select
+from app.attempts import AttemptWriter
+from app.database import SessionLocal
+from app.models import QuizAttempt
+from tests.conftest import TEST_CATEGORY, quiz_form
+
+
+def test_submission_written_when_writer_stops_mid_request(client, user, monkeypatch):
+    # The writer is running when the submission starts and has stopped by the
+    # time the rows are offered; they must be written synchronously
+    reads = iter([True])
+    monkeypatch.setattr(AttemptWriter, "running", property(lambda self: next(reads, False)))
+
+    form = quiz_form(client.get("/questions", params={"category": TEST_CATEGORY}).text)
+    assert client.post("/submit-quiz", data=form).status_code == 200
+
+    with SessionLocal() as db:
+        count = db.scalar(
+            select(func.count()).select_from(QuizAttempt).where(QuizAttempt.session_id == int(form["session_id"]))
+        )
+    assert count == 5
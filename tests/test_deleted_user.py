@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy import text
+from app.database import SessionLocal
+from app.utils import check_secret_key
+from tests.conftest import TEST_CATEGORY, quiz_form
+
+
+def delete_user(username: str):
+    """Deletes a user and their quiz sessions behind the app's back; their session token stays valid."""
+    with SessionLocal() as db:
+        params = {"username": username}
+        user_id = "SELECT id FROM users WHERE username = :username"
+        db.execute(text(f"DELETE FROM quiz_sessions WHERE user_id IN ({user_id})"), params)
+        db.execute(text("DELETE FROM users WHERE username = :username"), params)
+        db.commit()
+
+
+def test_deleted_user_submit_redirects_to_login(client, user):
+    form = quiz_form(client.get("/questions", params={"category": TEST_CATEGORY}).text)
+    delete_user(user)
+    response = client.post("/submit-quiz", data=form, follow_redirects=False)
+    assert response.status_code == 303
+    assert response.headers["location"] == "/login"
+
+
+def test_deleted_user_api_is_unauthenticated(client, user):
+    quiz = client.get("/api/v1/quiz", params={"category": TEST_CATEGORY}).json()
+    delete_user(user)
+    answers = {question["id"]: "b" for question in quiz["questions"]}
+    assert client.post(f"/api/v1/quiz/{quiz['session_id']}/submit", json={"answers": answers}).status_code == 401
+    assert client.get("/api/v1/quiz", params={"category": TEST_CATEGORY}).status_code == 401
+
+
+def test_missing_secret_key_fails(monkeypatch):
+    monkeypatch.setattr("app.utils.SECRET_KEY", None)
+    with pytest.raises(RuntimeError):
+        check_secret_key()
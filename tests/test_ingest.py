@@ -0,0 +1,63 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from sqlalchemy import delete, select
+from app.database import SessionLocal
+from app.ingest import ingest_questions, question_content_hash
+from app.models import Question
+from tests.conftest import TEST_CATEGORY, TEST_PREFIX
+
+STUB_ITEMS = [
+    {
+        # Surrounding whitespace is stripped before hashing, as the legacy backfill does
+        "category": f" {TEST_CATEGORY} " if n == 0 else TEST_CATEGORY, "difficulty": "medium ",
+        "question": f"Who directed &quot;{TEST_PREFIX} {n}&quot;?",
+        "correct_answer": "Steven Spielberg", "incorrect_answers": ["A &amp; B", "C", "D"],
+    }
+    for n in range(3)
+] + [{"question": "Not a 4-option question", "correct_answer": "x", "incorrect_answers": ["y"]}]
+
+
+class StubSource(BaseHTTPRequestHandler):
+    """Serves opentdb-style responses: /questions has results, any other path has none."""
+
+    def do_GET(self):
+        body = {"response_code": 0, "results": STUB_ITEMS} if self.path == "/questions" else {"response_code": 0}
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server(test_questions):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubSource)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    with SessionLocal() as db:
+        db.execute(delete(Question).where(Question.question_text.like(f"Who directed%{TEST_PREFIX}%")))
+        db.commit()
+
+
+def test_ingest_from_stub_server(stub_server):
+    sources = [f"{stub_server}/questions", f"{stub_server}/empty"]
+    assert ingest_questions(sources, batch_size=2) == 3
+
+    with SessionLocal() as db:
+        question = db.execute(
+            select(Question).where(Question.question_text == f'Who directed "{TEST_PREFIX} 0"?')
+        ).scalar_one()
+    options = {question.option_a, question.option_b, question.option_c, question.option_d}
+    assert options == {"Steven Spielberg", "A & B", "C", "D"}
+    assert question.correct_option == "Steven Spielberg"
+    assert (question.category, question.difficulty) == (TEST_CATEGORY, "medium")
+    assert question.content_hash == question_content_hash(TEST_CATEGORY, question.question_text, "Steven Spielberg")
+
+    # The same items again are recognized by their content hash
+    assert ingest_questions(sources) == 0
@@ -0,0 +1,48 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from app.hashing import hashing_pool
+from app.metrics import MetricsRegistry
+from tests.conftest import TEST_PREFIX
+
+
+def test_scrape_while_requests_in_flight(client, monkeypatch):
+    # observe() and render() must run on the same thread, the event loop's
+    threads = {"observe": set(), "render": set()}
+    observe, render = MetricsRegistry.observe, MetricsRegistry.render
+
+    def recording_observe(self, *args, **kwargs):
+        threads["observe"].add(threading.get_ident())
+        return observe(self, *args, **kwargs)
+
+    def recording_render(self, *args, **kwargs):
+        threads["render"].add(threading.get_ident())
+        return render(self, *args, **kwargs)
+
+    monkeypatch.setattr(MetricsRegistry, "observe", recording_observe)
+    monkeypatch.setattr(MetricsRegistry, "render", recording_render)
+
+    # Each path is a new route label or status, so observe() keeps adding entries
+    paths = ["/login", "/register", "/home", "/no-such-page", "/api/v1/stats", "/admin"] * 10
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        requests = [pool.submit(client.get, path, follow_redirects=False) for path in paths]
+        scrapes = [pool.submit(client.get, "/metrics") for _ in range(20)]
+        assert all(scrape.result().status_code == 200 for scrape in scrapes)
+        for request in requests:
+            request.result()
+
+    assert threads["render"] and threads["render"] == threads["observe"]
+    assert "quiz_http_requests_total" in client.get("/metrics").text
+
+
+def test_hashing_pool_exported(client, monkeypatch):
+    monkeypatch.setattr(hashing_pool, "_slots", threading.BoundedSemaphore(1))
+    assert hashing_pool._slots.acquire(blocking=False)  # the pool is now full
+    rejected = hashing_pool.stats()["rejected"]
+    username = f"{TEST_PREFIX}_busy"
+    response = client.post("/register", data={"username": username, "email": f"{username}@example.com", "password": "x"})
+    assert response.status_code == 503
+
+    text = client.get("/metrics").text
+    assert f"quiz_hashing_pool_rejected_total{{}} {rejected + 1}" in text
+    for name in ("in_flight", "wait_seconds_total", "compute_seconds_total"):
+        assert f"quiz_hashing_pool_{name}{{}} " in text
@@ -0,0 +1,25 @@
+from sqlalchemy import func, insert, select, text
+from app.database import engine
+from app.models import QuizAttempt, QuizSession, User
+from app.partitions import DEFAULT_PARTITION, add_months, current_month, ensure_partitions, list_partitions, partition_name
+
+
+def test_attempts_past_the_partitions_are_moved_out_of_default(test_questions, user):
+    month = add_months(current_month(), 24)  # far past the partitions kept ahead
+    # Everything happens in one transaction that is rolled back, DDL included
+    with engine.connect() as connection:
+        user_id = connection.execute(select(User.id).where(User.username == user)).scalar_one()
+        session_id = connection.execute(
+            insert(QuizSession).values(user_id=user_id).returning(QuizSession.id)
+        ).scalar_one()
+        connection.execute(insert(QuizAttempt).values(
+            user_id=user_id, question_id=test_questions[0], user_option=1, correct_option=1, is_correct=True,
+            session_id=session_id, attempted_at=func.make_timestamptz(month.year, month.month, 15, 12, 0, 0, "UTC"),
+        ))
+        assert connection.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}")).scalar() == 1
+
+        assert partition_name(month) in ensure_partitions(connection)
+        assert partition_name(month) in list_partitions(connection)
+        assert connection.execute(text(f"SELECT count(*) FROM {DEFAULT_PARTITION}")).scalar() == 0
+        assert connection.execute(text(f"SELECT count(*) FROM {partition_name(month)}")).scalar() == 1
+        connection.rollback()
@@ -0,0 +1,52 @@
+from app.querydebug import assert_query_budget
+from app.review import review_cache
+from tests.conftest import TEST_CATEGORY, quiz_form
+
+
+def test_home_query_budget(client, user):
+    client.get("/home")  # warms the catalog cache, which is refreshed at most every few seconds
+    with assert_query_budget(4) as recorder:
+        response = client.get("/home")
+    assert response.status_code == 200
+    assert not recorder.repeated()
+
+
+def test_questions_query_budget(client, user):
+    client.get("/questions", params={"category": TEST_CATEGORY})  # warms the catalog cache and the sampler
+    with assert_query_budget(6) as recorder:
+        response = client.get("/questions", params={"category": TEST_CATEGORY})
+    assert response.status_code == 200
+    assert response.text.count('type="radio"') == 5 * 4
+    assert not recorder.repeated()
+
+
+def test_submit_query_budget(client, user):
+    form = quiz_form(client.get("/questions", params={"category": TEST_CATEGORY}).text)
+    # Includes the catalog version check that tells whether the answer key is current
+    with assert_query_budget(6) as recorder:
+        response = client.post("/submit-quiz", data=form)
+    assert response.status_code == 200
+    assert not recorder.repeated()
+
+
+def test_review_query_budget(client, user):
+    form = quiz_form(client.get("/questions", params={"category": TEST_CATEGORY}).text)
+    client.post("/submit-quiz", data=form)
+
+    # First view looks up the question texts, repeat views are served from the cache
+    with assert_query_budget(1):
+        first = client.get("/review-quiz", params={"session_id": form["session_id"]})
+    with assert_query_budget(0):
+        again = client.get("/review-quiz", params={"session_id": form["session_id"]})
+    assert first.status_code == again.status_code == 200
+    assert first.text.count("Correct Answer:") == 5
+
+
+def test_review_query_budget_uncached(client, user):
+    form = quiz_form(client.get("/questions", params={"category": TEST_CATEGORY}).text)
+    client.post("/submit-quiz", data=form)
+    review_cache.clear()
+
+    with assert_query_budget(1):
+        response = client.get("/review-quiz", params={"session_id": form["session_id"]})
+    assert response.text.count("Correct Answer:") == 5
@@ -0,0 +1,21 @@
+from app.database import SessionLocal
+from app.sampler import QuestionSampler
+
+
+def test_own_write_keeps_buckets(test_questions):
+    sampler = QuestionSampler()
+    sampler.sync(1)
+    with SessionLocal() as db:
+        size = sampler.size(db)
+    sampler.discard(test_questions[0])
+
+    # The local edit produced version 2: the buckets stay, with the edit applied
+    sampler.advance(2)
+    sampler.sync(2)
+    assert sampler._pools is not None
+    with SessionLocal() as db:
+        assert sampler.size(db) == size - 1
+
+    # Version 4 came from elsewhere: the buckets are dropped
+    sampler.sync(4)
+    assert sampler._pools is None
@@ -0,0 +1,31 @@
+from sqlalchemy import update
+from app.database import SessionLocal
+from app.models import Question
+from app.search import search_questions
+from tests.conftest import TEST_CATEGORY, TEST_PREFIX
+
+
+def test_search_pages_through_tied_ranks(test_questions):
+    # Every test question matches the term the same way, so all ten tie on rank
+    # and page boundaries fall inside the tie
+    with SessionLocal() as db:
+        seen = []
+        page = search_questions(db, TEST_CATEGORY, page_size=3)
+        seen += [q.id for q in page.rows]
+        while page.next_cursor and len(seen) <= len(test_questions):
+            page = search_questions(db, TEST_CATEGORY, cursor=page.next_cursor, page_size=3)
+            seen += [q.id for q in page.rows]
+    assert sorted(seen) == sorted(test_questions)
+
+
+def test_search_by_difficulty(test_questions):
+    difficulty = f"{TEST_PREFIX}_level"
+    with SessionLocal() as db:
+        db.execute(update(Question).where(Question.id == test_questions[0]).values(difficulty=difficulty))
+        db.commit()
+        try:
+            page = search_questions(db, difficulty.upper())
+            assert [q.id for q in page.rows] == [test_questions[0]]
+        finally:
+            db.execute(update(Question).where(Question.id == test_questions[0]).values(difficulty="easy"))
+            db.commit()